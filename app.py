@@ -1,20 +1,84 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from datetime import datetime, date
+import csv
+import io
+import json
+import os
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, session, flash, jsonify, stream_with_context
+from datetime import datetime, timedelta
 from functools import wraps
-
-from models import db, User, Event, Resource, EventResourceAllocation
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User, Event, Resource, EventResourceAllocation, Job
+from config import Config
+from utils.archive import archive_past_events
+from utils.schema import upgrade_database
+from utils.reports import utilization_report as build_utilization_report
+from utils.jobs import JobQueueFull, JobRunner
+from utils.profiling import init_profiling
+from utils.changefeed import format_sse, init_change_feed
+from utils.sync import InvalidSyncToken, changes_since, decode_token, init_sync, purge_tombstones
+from utils.serialization import FastJSONProvider
+from utils.compression import init_compression
+from utils.ratelimit import check_rate_limit, init_rate_limiting
+from utils.timezones import get_zone, parse_datetime, timezone_choices, to_local, utc_isoformat
+from utils.ical import (
+    feed_etag, generate_calendar, init_ical_feeds,
+    resource_feed_query, resource_feed_state, user_feed_query, user_feed_state
+)
+from utils.conflict_checker import (
+    book_resources,
+    earliest_bundle_window,
+    free_resources_of_type,
+    nearest_free_windows,
+    resolve_resources_by_type
+)
 
 # -------------------------------------------------
 # Flask App Configuration
 # -------------------------------------------------
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///events.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///events.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.secret_key = "simple-secret-key"
+app.config['ARCHIVE_HORIZON_DAYS'] = Config.ARCHIVE_HORIZON_DAYS
+app.config['PROFILING_DEBUG_HEADERS'] = Config.PROFILING_DEBUG_HEADERS
+app.config['N_PLUS_ONE_THRESHOLD'] = Config.N_PLUS_ONE_THRESHOLD
+app.config['CHANGE_FEED_BUFFER'] = Config.CHANGE_FEED_BUFFER
+app.config['SYNC_TOMBSTONE_DAYS'] = Config.SYNC_TOMBSTONE_DAYS
+app.config['COMPRESSION_MIN_SIZE'] = Config.COMPRESSION_MIN_SIZE
+app.config['RATE_LIMIT_DEFAULT'] = Config.RATE_LIMIT_DEFAULT
+app.config['RATE_LIMITS'] = Config.RATE_LIMITS
+app.config['RATE_LIMIT_STORE'] = Config.RATE_LIMIT_STORE
+app.config['ICAL_CACHE_SIZE'] = Config.ICAL_CACHE_SIZE
 
 db.init_app(app)
 
+# Older databases lack columns and indexes added since; see `flask upgrade-db`
+if Config.AUTO_UPGRADE_DB:
+    with app.app_context():
+        upgrade_database(db.engine)
+
+change_feed = init_change_feed(app)
+ical_feeds = init_ical_feeds(app)
+init_sync()
+
+if Config.PROFILING_ENABLED:
+    init_profiling(app)
+
+if Config.COMPRESSION_ENABLED:
+    init_compression(app)
+
+if Config.RATE_LIMIT_ENABLED:
+    init_rate_limiting(app)
+
+job_runner = JobRunner(
+    app,
+    max_workers=Config.JOB_WORKERS,
+    max_pending=Config.JOB_MAX_PENDING,
+    heartbeat_seconds=Config.JOB_HEARTBEAT_SECONDS
+)
+
 # -------------------------------------------------
 # Login Required Decorator
 # -------------------------------------------------
@@ -23,10 +87,18 @@ def login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user' not in session:
             return redirect(url_for('login'))
+        retry_after = check_rate_limit(f"user:{session['user']}")
+        if retry_after is not None:
+            return too_many_requests(retry_after)
         return f(*args, **kwargs)
     return decorated_function
 
 
+def too_many_requests(retry_after):
+    return Response("Too many requests, please slow down.", 429,
+                    {'Retry-After': str(retry_after)}, mimetype='text/plain')
+
+
 # -------------------------------------------------
 # Home
 # -------------------------------------------------
@@ -55,7 +127,13 @@ def register():
         user.set_password(password)
 
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent sign-up took the name between the check and the insert
+            db.session.rollback()
+            flash("Username already exists")
+            return redirect(url_for('register'))
 
         flash("Registration successful. Please login.")
         return redirect(url_for('login'))
@@ -119,6 +197,10 @@ def profile():
         user_events = []
         user_allocations = []
 
+    if user:
+        user.ensure_calendar_token()
+        db.session.commit()
+
     return render_template('profile.html', user=user, events=user_events, allocations=user_allocations)
 
 
@@ -130,10 +212,21 @@ def add_event():
         username = session.get('user')
         user = User.query.filter_by(username=username).first()
         
+        # The form's wall-clock times are local to the chosen timezone
+        tz_name = request.form.get('timezone') or Config.DEFAULT_TIMEZONE
+        try:
+            get_zone(tz_name)
+            start_time = parse_datetime(request.form['start_time'], tz_name)
+            end_time = parse_datetime(request.form['end_time'], tz_name)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return redirect(url_for('add_event'))
+
         event = Event(
             title=request.form['title'],
-            start_time=datetime.fromisoformat(request.form['start_time']),
-            end_time=datetime.fromisoformat(request.form['end_time']),
+            start_time=start_time,
+            end_time=end_time,
+            timezone=tz_name,
             description=request.form['description'],
             user_id=user.user_id if user else None  # Set the creator's user_id
         )
@@ -142,7 +235,7 @@ def add_event():
         flash("Event created successfully!", "success")
         return redirect(url_for('events'))
 
-    return render_template('add_event.html')
+    return render_template('add_event.html', timezones=timezone_choices(), default_timezone=Config.DEFAULT_TIMEZONE)
 
 
 @app.route('/events/delete/<int:event_id>', methods=['POST'])
@@ -158,8 +251,8 @@ def delete_event_web(event_id):
     # Only event owner can delete
     if user and hasattr(event, 'user_id') and event.user_id == user.user_id:
         try:
-            # Remove allocations first
-            EventResourceAllocation.query.filter_by(event_id=event.event_id).delete()
+            # Allocations are removed through the relationship cascade so the
+            # change feed sees each of them
             db.session.delete(event)
             db.session.commit()
             flash("Event deleted successfully!", "success")
@@ -172,6 +265,45 @@ def delete_event_web(event_id):
     return redirect(url_for('events'))
 
 
+@app.route('/api/events/<int:event_id>', methods=['PUT'])
+@login_required
+def update_event(event_id):
+    """
+    Edit an event (JSON; used by the edit dialog on /events). Times without
+    an offset are wall-clock times in the event's timezone, which may be
+    changed in the same request. Omitted fields keep their values.
+    """
+    event = Event.query.get_or_404(event_id)
+    user = User.query.filter_by(username=session.get('user')).first()
+    if user is None or event.user_id != user.user_id:
+        return jsonify({'message': 'You can only update your own events!'}), 403
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Expected a JSON object'}), 400
+    if 'title' in data and not (isinstance(data['title'], str) and data['title'].strip()):
+        return jsonify({'message': 'Title is required!'}), 400
+
+    tz_name = data.get('timezone') or event.timezone
+    try:
+        get_zone(tz_name)
+        start_time = parse_datetime(data['start_time'], tz_name) if data.get('start_time') else event.start_time
+        end_time = parse_datetime(data['end_time'], tz_name) if data.get('end_time') else event.end_time
+    except (ValueError, AttributeError) as e:
+        return jsonify({'message': str(e)}), 400
+    if start_time >= end_time:
+        return jsonify({'message': 'End time must be after start time!'}), 400
+
+    event.title = data.get('title', event.title)
+    event.description = data.get('description', event.description)
+    event.timezone = tz_name
+    event.start_time = start_time
+    event.end_time = end_time
+    db.session.commit()
+
+    return jsonify({'message': 'Event updated successfully!', 'event': event.to_dict()}), 200
+
+
 # -------------------------------------------------
 # Resources
 # -------------------------------------------------
@@ -179,7 +311,10 @@ def delete_event_web(event_id):
 @login_required
 def resources():
     resources = Resource.query.all()
-    return render_template('resources.html', resources=resources)
+    user = User.query.filter_by(username=session.get('user')).first()
+    calendar_token = user.ensure_calendar_token() if user else None
+    db.session.commit()
+    return render_template('resources.html', resources=resources, calendar_token=calendar_token)
 
 
 @app.route('/resources/add', methods=['GET', 'POST'])
@@ -188,7 +323,10 @@ def add_resource():
     if request.method == 'POST':
         resource = Resource(
             resource_name=request.form['name'],
-            resource_type=request.form['type']
+            resource_type=request.form['type'],
+            capacity=max(1, request.form.get('capacity', 1, type=int)),
+            buffer_before_minutes=max(0, request.form.get('buffer_before', 0, type=int)),
+            buffer_after_minutes=max(0, request.form.get('buffer_after', 0, type=int))
         )
         db.session.add(resource)
         db.session.commit()
@@ -204,6 +342,9 @@ def edit_resource(resource_id):
     resource = Resource.query.get_or_404(resource_id)
     resource.resource_name = request.form.get('name', resource.resource_name)
     resource.resource_type = request.form.get('type', resource.resource_type)
+    resource.capacity = max(1, request.form.get('capacity', resource.capacity, type=int))
+    resource.buffer_before_minutes = max(0, request.form.get('buffer_before', resource.buffer_before_minutes, type=int))
+    resource.buffer_after_minutes = max(0, request.form.get('buffer_after', resource.buffer_after_minutes, type=int))
     db.session.commit()
     flash("Resource updated successfully!", "success")
     return redirect(url_for('resources'))
@@ -222,6 +363,35 @@ def delete_resource(resource_id):
 # -------------------------------------------------
 # Allocation & Conflict Detection
 # -------------------------------------------------
+def booking_alternatives(event, resource_ids):
+    """
+    What to suggest when booking ``resource_ids`` for ``event`` conflicts,
+    for both the /allocate form and the JSON endpoint: ``bundle_window``,
+    the earliest window where every resource is free, and for a single
+    resource the free ``slots`` nearest the requested time plus free
+    ``resources`` of the same type.
+    """
+    resource_ids = sorted(set(resource_ids))
+    horizon = timedelta(days=Config.BOOKING_SEARCH_HORIZON_DAYS)
+    alternatives = {
+        'bundle_window': earliest_bundle_window(
+            resource_ids, event.end_time - event.start_time, event.start_time,
+            horizon=horizon, exclude_event_id=event.event_id
+        ),
+        'slots': [],
+        'resources': [],
+    }
+    if len(resource_ids) == 1:
+        resource = db.session.get(Resource, resource_ids[0])
+        alternatives['slots'] = nearest_free_windows(
+            resource, event.start_time, event.end_time,
+            count=Config.ALTERNATIVE_SLOT_COUNT, horizon=horizon,
+            not_before=datetime.utcnow(), exclude_event_id=event.event_id
+        )
+        alternatives['resources'] = free_resources_of_type(resource, event.start_time, event.end_time)
+    return alternatives
+
+
 @app.route('/allocate', methods=['GET', 'POST'])
 @login_required
 def allocate_resource():
@@ -232,28 +402,42 @@ def allocate_resource():
 
     if request.method == 'POST':
         event_id = int(request.form['event_id'])
-        resource_id = int(request.form['resource_id'])
-        event = Event.query.get(event_id)
-
-        conflict = (
-            EventResourceAllocation.query
-            .join(Event)
-            .filter(
-                EventResourceAllocation.resource_id == resource_id,
-                Event.start_time < event.end_time,
-                Event.end_time > event.start_time
-            ).first()
-        )
-
-        if conflict:
-            error = "This resource is already booked for another event during this time."
+        resource_ids = [int(r) for r in request.form.getlist('resource_id')]
+        event = Event.query.get_or_404(event_id)
+
+        known = {r.resource_id for r in resources}
+        if not resource_ids or not known.issuperset(resource_ids):
+            return render_template(
+                'allocate.html',
+                events=events,
+                resources=resources,
+                allocations=allocations,
+                error="Select at least one existing resource."
+            ), 400
+
+        # All selected resources are booked together or not at all
+        _, conflicts = book_resources(event, resource_ids)
+
+        if conflicts:
+            names = {r.resource_id: r.resource_name for r in resources}
+            booked = ', '.join(names.get(r, str(r)) for r in sorted(conflicts))
+            error = f"Already booked for another event during this time: {booked}."
+            alternatives = booking_alternatives(event, resource_ids)
+
+            if len(set(resource_ids)) == 1:
+                if alternatives['slots']:
+                    error += " Nearest free slots: " + ', '.join(
+                        f"{to_local(start, event.timezone):%Y-%m-%d %H:%M %Z}" for start, _ in alternatives['slots']
+                    ) + "."
+                if alternatives['resources']:
+                    resource_type = alternatives['resources'][0].resource_type
+                    error += f" Other free {resource_type} resources: " + ', '.join(
+                        r.resource_name for r in alternatives['resources']
+                    ) + "."
+            elif alternatives['bundle_window']:
+                start, end = (to_local(t, event.timezone) for t in alternatives['bundle_window'])
+                error += f" All selected resources are free {start:%Y-%m-%d %H:%M} - {end:%H:%M %Z}."
         else:
-            allocation = EventResourceAllocation(
-                event_id=event_id,
-                resource_id=resource_id
-            )
-            db.session.add(allocation)
-            db.session.commit()
             # Reload allocations instead of redirecting
             allocations = EventResourceAllocation.query.all()
             error = None  # Clear any previous errors, show success message
@@ -268,6 +452,99 @@ def allocate_resource():
     )
 
 
+@app.route('/events/<int:event_id>/allocate-resources', methods=['POST'])
+@login_required
+def allocate_resources(event_id):
+    """
+    Book several resources for an event in one go (JSON). Accepts explicit
+    ``resource_ids`` and/or ``resource_types`` ({"Projector": 1, "Staff": 2}).
+    Either every resource is booked or none is, and the response lists all
+    conflicts plus the earliest window where the whole bundle is free (for a
+    single resource also the nearest free slots and same-type alternatives).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Expected a JSON object'}), 400
+
+    def is_int(value):
+        # JSON true/false arrive as bool, a subclass of int
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    resource_ids = data.get('resource_ids')
+    type_counts = data.get('resource_types')
+    resource_ids = [] if resource_ids is None else resource_ids
+    type_counts = {} if type_counts is None else type_counts
+    if not (isinstance(resource_ids, list) and all(is_int(r) for r in resource_ids)):
+        return jsonify({'message': 'resource_ids must be a list of integers'}), 400
+    if not (isinstance(type_counts, dict) and all(is_int(c) for c in type_counts.values())):
+        return jsonify({'message': 'resource_types must be a {type: count} object with integer counts'}), 400
+
+    if not resource_ids and not type_counts:
+        return jsonify({'message': 'resource_ids or resource_types required'}), 400
+    if any(count < 1 for count in type_counts.values()):
+        return jsonify({'message': 'resource_types counts must be at least 1'}), 400
+
+    event = Event.query.get_or_404(event_id)
+
+    known = {r for (r,) in db.session.query(Resource.resource_id).filter(Resource.resource_id.in_(resource_ids))}
+    missing = sorted(set(resource_ids) - known)
+    if missing:
+        return jsonify({'message': 'Unknown resource(s)', 'resource_ids': missing}), 404
+
+    if type_counts:
+        # Resources named explicitly don't also count towards a type
+        by_type, shortfall = resolve_resources_by_type(
+            type_counts, event.start_time, event.end_time, exclude_ids=resource_ids
+        )
+        if shortfall:
+            return jsonify({
+                'message': 'Not enough free resources of the requested type(s)!',
+                'shortfall': shortfall
+            }), 400
+        resource_ids = resource_ids + by_type
+
+    allocations, conflicts = book_resources(event, resource_ids)
+
+    if conflicts:
+        alternatives = booking_alternatives(event, resource_ids)
+        window = alternatives['bundle_window']
+        return jsonify({
+            'message': 'Resource conflict detected!',
+            'conflicts': [
+                {
+                    'resource_id': resource_id,
+                    'conflicting_event_id': other.event_id,
+                    'conflicting_event': other.title,
+                    'conflict_time': f'{utc_isoformat(other.start_time)} - {utc_isoformat(other.end_time)}'
+                }
+                for resource_id, holders in sorted(conflicts.items())
+                for other in holders
+            ],
+            'earliest_available': {
+                'start_time': utc_isoformat(window[0]),
+                'end_time': utc_isoformat(window[1])
+            } if window else None,
+            # Only for a single resource: other times for it, or other resources of its type
+            'alternative_slots': [
+                {'start_time': utc_isoformat(start), 'end_time': utc_isoformat(end)}
+                for start, end in alternatives['slots']
+            ],
+            'alternative_resources': [
+                {'resource_id': r.resource_id, 'resource_name': r.resource_name}
+                for r in alternatives['resources']
+            ]
+        }), 400
+
+    return jsonify({
+        'message': 'Resources allocated successfully!',
+        'event': event.title,
+        'allocations': [
+            {'allocation_id': a.allocation_id, 'resource_id': a.resource_id}
+            for a in allocations
+        ]
+    }), 201
+
+
 @app.route('/allocations')
 @login_required
 def view_allocations():
@@ -308,6 +585,104 @@ def remove_allocation(alloc_id):
     return redirect(url_for('view_allocations'))
 
 
+# -------------------------------------------------
+# Change Feed (Server-Sent Events)
+# -------------------------------------------------
+@app.route('/changes')
+@login_required
+def change_stream():
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscriber = change_feed.subscribe(last_event_id)
+
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                messages = subscriber.wait(timeout=15)
+                if not messages:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                for message in messages:
+                    yield format_sse(message)
+        finally:
+            change_feed.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# -------------------------------------------------
+# Delta Sync
+# -------------------------------------------------
+@app.route('/sync')
+@login_required
+def sync():
+    """Rows changed or deleted since ?since=<token>; omit the token for a full snapshot."""
+    token = request.args.get('since')
+    try:
+        since = decode_token(token) if token else None
+    except InvalidSyncToken as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify(changes_since(since, app.config['SYNC_TOMBSTONE_DAYS'])), 200
+
+
+# -------------------------------------------------
+# Calendar Feeds
+# -------------------------------------------------
+def serve_feed(key, name, query, state):
+    """
+    Serve an .ics feed: 304 when the client already has the current version,
+    the cached body when there is one, otherwise render and cache it. The
+    body is rendered in full before sending so no cursor (and, on SQLite,
+    no shared lock) is held while a slow client reads the response.
+    """
+    etag = feed_etag(name, state)
+    # Weak, so response compression leaves it alone and clients can revalidate either encoding
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body = ical_feeds.get(key, etag)
+        if body is None:
+            body = b''.join(generate_calendar(name, query))
+            ical_feeds.put(key, etag, body)
+        response = Response(body, mimetype='text/calendar')
+
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def get_feed_owner_or_404(token):
+    user = User.query.filter_by(calendar_token=token).first_or_404()
+    retry_after = check_rate_limit(f'user:{user.username}')
+    if retry_after is not None:
+        abort(too_many_requests(retry_after))
+    return user
+
+
+@app.route('/calendar/<token>/events.ics')
+def user_calendar_feed(token):
+    user = get_feed_owner_or_404(token)
+    return serve_feed(
+        ('user', user.user_id), f"{user.username}'s events",
+        user_feed_query(user.user_id), user_feed_state(user.user_id)
+    )
+
+
+@app.route('/calendar/<token>/resources/<int:resource_id>.ics')
+def resource_calendar_feed(token, resource_id):
+    get_feed_owner_or_404(token)
+    resource = Resource.query.get_or_404(resource_id)
+    return serve_feed(
+        ('resource', resource_id), resource.resource_name,
+        resource_feed_query(resource_id), resource_feed_state(resource_id)
+    )
+
+
 # -------------------------------------------------
 # Resource Utilization Report
 # -------------------------------------------------
@@ -320,29 +695,137 @@ def utilization_report():
         start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
         end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
 
-        for resource in Resource.query.all():
-            total_hours = bookings = upcoming = 0
+        # Wide ranges can run as a background job instead of inside the request
+        if request.form.get('background'):
+            return submit_job('utilization_report', {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat()
+            })
 
-            for alloc in resource.allocations:
-                event = alloc.event
-                event_date = event.start_time.date()
+        report_data = build_utilization_report(start_date, end_date, workers=Config.REPORT_WORKERS)
 
-                if start_date <= event_date <= end_date:
-                    total_hours += (event.end_time - event.start_time).total_seconds() / 3600
-                    bookings += 1
+    return render_template('report.html', report_data=report_data)
 
-                if event.start_time.date() > date.today():
-                    upcoming += 1
 
-            report_data.append({
-                'name': resource.resource_name,
-                'type': resource.resource_type,
-                'hours': round(total_hours, 2),
-                'bookings': bookings,
-                'upcoming': upcoming
-            })
+# -------------------------------------------------
+# Background Jobs
+# -------------------------------------------------
+def current_user_id():
+    user = User.query.filter_by(username=session.get('user')).first()
+    return user.user_id if user else None
 
-    return render_template('report.html', report_data=report_data)
+
+def get_own_job_or_404(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != current_user_id():
+        abort(404)
+    return job
+
+
+def submit_job(kind, params):
+    try:
+        job = job_runner.submit(kind, params, user_id=current_user_id())
+    except JobQueueFull as e:
+        flash(str(e))
+        return redirect(url_for('list_jobs'))
+    flash(f"Job #{job.job_id} queued. Refresh this page to follow its progress.")
+    return redirect(url_for('list_jobs'))
+
+
+@app.route('/jobs')
+@login_required
+def list_jobs():
+    job_runner.recover()
+    jobs = (
+        Job.query
+        .filter(Job.user_id == current_user_id())
+        .order_by(Job.created_at.desc())
+        .limit(50)
+        .all()
+    )
+    return render_template('jobs.html', jobs=jobs)
+
+
+@app.route('/jobs/maintenance', methods=['POST'])
+@login_required
+def submit_maintenance_job():
+    kind = request.form.get('kind')
+    if kind == 'archive_events':
+        return submit_job(kind, {'horizon_days': app.config['ARCHIVE_HORIZON_DAYS']})
+    if kind == 'purge_tombstones':
+        return submit_job(kind, {'days': app.config['SYNC_TOMBSTONE_DAYS']})
+    flash("Unknown maintenance task")
+    return redirect(url_for('list_jobs'))
+
+
+@app.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = get_own_job_or_404(job_id)
+    return jsonify({
+        'job_id': job.job_id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at
+    }), 200
+
+
+@app.route('/jobs/<int:job_id>/download')
+@login_required
+def download_job_result(job_id):
+    job = get_own_job_or_404(job_id)
+    if job.status != 'done':
+        flash("Job has not finished yet")
+        return redirect(url_for('list_jobs'))
+
+    result = json.loads(job.result)
+    if request.args.get('format') == 'csv' and isinstance(result, list) and result:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(result[0]))
+        writer.writeheader()
+        writer.writerows(result)
+        body, mimetype, extension = output.getvalue(), 'text/csv', 'csv'
+    else:
+        body, mimetype, extension = job.result, 'application/json', 'json'
+
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={job.kind}-{job.job_id}.{extension}'}
+    )
+
+
+# -------------------------------------------------
+# Archival
+# -------------------------------------------------
+@app.cli.command('archive-events')
+def archive_events_command():
+    """Move events past the archive horizon into the archive tables."""
+    archived = archive_past_events(app.config['ARCHIVE_HORIZON_DAYS'])
+    print(f"Archived {archived} event(s).")
+
+
+@app.cli.command('purge-tombstones')
+def purge_tombstones_command():
+    """Drop sync tombstones older than SYNC_TOMBSTONE_DAYS."""
+    purged = purge_tombstones(app.config['SYNC_TOMBSTONE_DAYS'])
+    print(f"Purged {purged} tombstone(s).")
+
+
+# -------------------------------------------------
+# Database Upgrades
+# -------------------------------------------------
+@app.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Create missing tables and add columns, indexes and constraints older databases lack."""
+    changes = upgrade_database(db.engine)
+    for table, columns in changes.items():
+        print(f"Upgraded {table}" + (f": added {', '.join(columns)}" if columns else ""))
+    print("Database is up to date." if not changes else f"Upgraded {len(changes)} table(s).")
 
 
 # -------------------------------------------------
@@ -0,0 +1,27 @@
+"""
+ASGI entry point.
+
+    uvicorn asgi:application --workers 1
+
+The read-heavy JSON endpoints under /api/ are served natively with aiosqlite,
+so one process can hold many concurrent clients without tying up a thread
+each. Every other path is handed to the Flask app through asgiref's WSGI
+adapter and behaves exactly as under a WSGI server.
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+from config import Config
+from models import db
+from routes.async_api import AsyncAPI
+
+with app.app_context():
+    database = db.engine.url.database
+
+application = AsyncAPI(
+    database,
+    fallback=WsgiToAsgi(app),
+    pool_size=Config.ASYNC_DB_POOL_SIZE,
+    # Same buckets as the Flask views (None when rate limiting is off)
+    limiter=app.extensions.get('rate_limiter'),
+)
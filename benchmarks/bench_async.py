@@ -0,0 +1,128 @@
+"""
+Concurrency comparison of the native async API against the sync Flask stack.
+
+    python -m benchmarks.bench_async --events 20000 --clients 8 64 256 --threads 8
+
+The sync side serves an equivalent Flask + SQLAlchemy view from a pool of
+``--threads`` worker threads (like ``gunicorn --threads``); the async side
+drives ``asgi.application`` in-process from a single event loop. Use
+``--io-latency-ms`` to add a fixed wait per request on both sides and see how
+each stack behaves when requests spend their time waiting rather than
+computing.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import measure_concurrent, print_results, summarize
+from benchmarks.seed import add_arguments, seed_from_args
+
+
+async def call_asgi(application, path, query):
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [],
+    }
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+def bench_async(application, requests, clients, latency):
+    async def runner():
+        semaphore = asyncio.Semaphore(clients)
+        latencies = []
+
+        async def one(i):
+            async with semaphore:
+                t0 = time.perf_counter()
+                if latency:
+                    await asyncio.sleep(latency)
+                status = await call_asgi(application, '/api/events', f'page={i % 5 + 1}&per_page=50')
+                assert status == 200, status
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+        await application.pool.close()
+        return latencies, elapsed
+
+    latencies, elapsed = asyncio.run(runner())
+    result = summarize(f'async /api/events ({clients} clients)', latencies, elapsed)
+    result['concurrency'] = clients
+    return result
+
+
+def add_sync_view(app, latency):
+    from flask import jsonify, request
+    from models import Event
+
+    def sync_events():
+        if latency:
+            time.sleep(latency)
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 10)), 100)
+        paginated = Event.query.order_by(Event.start_time.asc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        return jsonify({
+            'events': [{
+                'event_id': e.event_id,
+                'user_id': e.user_id,
+                'title': e.title,
+                'start_time': e.start_time.isoformat(),
+                'end_time': e.end_time.isoformat(),
+                'description': e.description,
+            } for e in paginated.items],
+            'total': paginated.total,
+        })
+
+    app.add_url_rule('/bench/sync-events', 'bench_sync_events', sync_events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--threads', type=int, default=8, help='worker threads of the sync stack')
+    parser.add_argument('--io-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    app, counts = seed_from_args(args)
+    print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
+    latency = args.io_latency_ms / 1000
+
+    add_sync_view(app, latency)
+
+    def sync_request(i):
+        response = app.test_client().get(f'/bench/sync-events?page={i % 5 + 1}&per_page=50')
+        assert response.status_code == 200, response.status_code
+
+    results = [measure_concurrent(
+        f'sync /events ({args.threads} threads)', sync_request, args.requests, args.threads
+    )]
+
+    from asgi import application
+    for clients in args.clients:
+        results.append(bench_async(application, args.requests, clients, latency))
+
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
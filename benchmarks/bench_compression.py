@@ -0,0 +1,55 @@
+"""
+Bytes on the wire and latency of large pages with and without compression.
+
+    python -m benchmarks.bench_compression --events 5000 --iterations 20
+
+Each page is fetched with ``Accept-Encoding: identity``, ``gzip`` and
+``br`` (when the brotli package is installed). The first compressed fetch
+of a page fills the compressed-body cache; later identical fetches reuse it.
+"""
+import argparse
+
+from benchmarks.common import measure
+from benchmarks.seed import add_arguments, seed_from_args
+
+PAGES = ['/allocate', '/events', '/sync']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app, counts = seed_from_args(args)
+    print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
+
+    from utils.compression import brotli
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = 'user1'
+
+    print(f"{'page':<12} {'encoding':<10} {'bytes':>12} {'ratio':>7} {'p50 ms':>10} {'p99 ms':>10}")
+    for page in PAGES:
+        identity_size = None
+        for encoding in encodings:
+            headers = {'Accept-Encoding': encoding}
+
+            def fetch(_):
+                # Time only successful responses; an error page is small and fast
+                response = client.get(page, headers=headers)
+                assert response.status_code == 200, response.status_code
+                return response
+
+            size = len(fetch(None).get_data())
+            identity_size = identity_size or size
+
+            result = measure(f'{page} {encoding}', fetch, args.iterations, warmup=1)
+            print(f"{page:<12} {encoding:<10} {size:>12} {size / identity_size:>7.2f} "
+                  f"{result['p50_ms']:>10} {result['p99_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Speedup of the partitioned utilization report across worker processes.
+
+    python -m benchmarks.bench_report --events 500000 --resources 400 --workers 1 2 4 8
+
+Runs the same report (the whole seeded date range) with each worker count,
+checks every run returns identical rows, and prints wall time and speedup
+relative to a single in-process run. Speedup is bounded by the number of
+cores and by how evenly bookings spread over resources.
+"""
+import argparse
+import os
+import time
+from datetime import timedelta
+
+from benchmarks.seed import add_arguments, seed_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs per worker count')
+    args = parser.parse_args()
+
+    app, counts = seed_from_args(args)
+    print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
+    print(f'{os.cpu_count()} CPU(s) available')
+
+    from models import db, Event
+    from utils.reports import utilization_report
+
+    with app.app_context():
+        first, last = db.session.query(db.func.min(Event.start_time), db.func.max(Event.start_time)).one()
+        start_date, end_date = first.date(), (last + timedelta(days=1)).date()
+
+        baseline_rows = None
+        baseline_time = None
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        for workers in args.workers:
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                rows = utilization_report(start_date, end_date, workers=workers)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            if baseline_rows is None:
+                baseline_rows, baseline_time = rows, best
+            assert rows == baseline_rows, f'{workers} workers returned different results'
+            print(f'{workers:>8} {best:>10.3f} {baseline_time / best:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmarks for the scheduling hot paths.
+
+    python -m benchmarks.bench_scheduling --events 20000 --iterations 200
+    python -m benchmarks.bench_scheduling --save baseline.json
+    python -m benchmarks.bench_scheduling --baseline baseline.json --tolerance 0.15
+
+Each run seeds a fresh SQLite database so numbers are reproducible for a
+given ``--seed``. With ``--baseline`` the process exits non-zero when any
+benchmark's throughput dropped by more than ``--tolerance``.
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import compare_to_baseline, measure, measure_concurrent, print_results
+from benchmarks.seed import add_arguments, seed_from_args
+
+
+def login(client, username):
+    with client.session_transaction() as session:
+        session['user'] = username
+
+
+def run(args):
+    app, counts = seed_from_args(args)
+    print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
+
+    from models import db, Event
+    from utils.conflict_checker import has_resource_conflict
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        first, last = db.session.query(db.func.min(Event.start_time), db.func.max(Event.start_time)).one()
+    span = int((last - first).total_seconds() // 60)
+
+    def random_window():
+        begins = first + timedelta(minutes=rng.randrange(span))
+        return begins, begins + timedelta(minutes=rng.choice([30, 60, 120]))
+
+    results = []
+
+    # --- has_resource_conflict -------------------------------------------
+    def conflict_check(_):
+        begins, ends = random_window()
+        has_resource_conflict(rng.randint(1, counts['resources']), begins, ends)
+
+    with app.app_context():
+        results.append(measure('has_resource_conflict', conflict_check, args.iterations))
+
+    # --- get_events style filtering + pagination -------------------------
+    def events_page(_):
+        begins, _ends = random_window()
+        (
+            Event.query
+            .filter(Event.start_time >= begins, Event.start_time <= begins + timedelta(days=7))
+            .order_by(Event.start_time.asc())
+            .paginate(page=rng.randint(1, 3), per_page=100, error_out=False)
+            .items
+        )
+
+    with app.test_request_context():
+        results.append(measure('events filter+paginate (per_page=100)', events_page, args.iterations))
+
+    client = app.test_client()
+    login(client, 'user1')
+
+    # --- /allocate POST ---------------------------------------------------
+    def allocate(_):
+        response = client.post('/allocate', data={
+            'event_id': rng.randint(1, counts['events']),
+            'resource_id': rng.randint(1, counts['resources']),
+        })
+        assert response.status_code == 200, response.status_code
+
+    results.append(measure('POST /allocate', allocate, max(1, args.iterations // 10), warmup=1))
+
+    # --- utilization report ----------------------------------------------
+    def report(_):
+        begins, _ends = random_window()
+        response = client.post('/report', data={
+            'start_date': begins.date().isoformat(),
+            'end_date': (begins + timedelta(days=30)).date().isoformat(),
+        })
+        assert response.status_code == 200, response.status_code
+
+    results.append(measure('POST /report (30 days)', report, max(1, args.iterations // 20), warmup=1))
+
+    # --- registration under concurrency ----------------------------------
+    run_id = datetime.utcnow().strftime('%H%M%S%f')
+
+    def register(i):
+        response = app.test_client().post('/register', data={
+            'username': f'bench-{run_id}-{i}',
+            'password': 'benchmark',
+        })
+        assert response.status_code == 302, response.status_code
+
+    results.append(measure_concurrent(
+        f'POST /register (x{args.concurrency} threads)', register,
+        max(args.concurrency, args.iterations // 10), args.concurrency
+    ))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--save', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed throughput drop versus the baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        for name, before, after, change in regressions:
+            print(f'REGRESSION {name}: {before} -> {after} ops/sec ({change:+.0%})')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+def summarize(name, latencies, wall_seconds):
+    latencies = sorted(latencies)
+    return {
+        'name': name,
+        'ops': len(latencies),
+        'ops_per_sec': round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def measure(name, fn, iterations, warmup=5):
+    """Call ``fn(i)`` ``iterations`` times sequentially and summarize latency."""
+    for i in range(warmup):
+        fn(i)
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(name, latencies, time.perf_counter() - started)
+
+
+def measure_concurrent(name, fn, iterations, concurrency):
+    """Run ``fn(i)`` ``iterations`` times across ``concurrency`` threads."""
+    def timed(i):
+        t0 = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(iterations)))
+    result = summarize(name, latencies, time.perf_counter() - started)
+    result['concurrency'] = concurrency
+    return result
+
+
+def print_results(results):
+    print(f"{'benchmark':<40} {'ops':>7} {'ops/sec':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<40} {r['ops']:>7} {r['ops_per_sec']:>10} {r['p50_ms']:>10} {r['p99_ms']:>10}")
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    """
+    Compare ops/sec against a previously saved JSON run. Returns the list of
+    benchmarks whose throughput dropped by more than ``tolerance`` (0-1).
+    """
+    with open(baseline_path) as f:
+        baseline = {r['name']: r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        before = baseline.get(r['name'])
+        if not before or not before['ops_per_sec']:
+            continue
+        change = (r['ops_per_sec'] - before['ops_per_sec']) / before['ops_per_sec']
+        if change < -tolerance:
+            regressions.append((r['name'], before['ops_per_sec'], r['ops_per_sec'], change))
+    return regressions
@@ -0,0 +1,349 @@
+"""
+Load test: drive a running server with a mix of sign-ins, event listings,
+sign-ups and resource bookings at increasing concurrency, then check that
+the database is still consistent.
+
+    python -m benchmarks.loadtest --events 2000 --concurrency 4 16 64 --duration 20
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --database-url sqlite:////srv/events.db
+
+Without ``--url`` a throwaway SQLite database is seeded and the app is
+started in a separate process (Flask's threaded server, rate limiting off).
+With ``--url`` an already running server (e.g. gunicorn against a local
+Postgres) is targeted and ``--database-url`` must point at its database for
+the invariant checks. Exits non-zero when an invariant is violated: a
+resource booked over capacity, or a sign-up answered with a 5xx (racing
+sign-ups for one name must end in one account and "already exists"
+redirects, never a server error).
+
+Operations (weights set with ``--mix``):
+  login     POST /login with a seeded account
+  events    GET /events
+  register  POST /register from a small pool of names, so sign-ups race
+  allocate  POST /allocate for random events and one or two resources
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.common import percentile
+from benchmarks.seed import DEFAULT_PASSWORD, add_arguments, seed_from_args
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = 'login=1,events=6,register=1,allocate=2'
+
+
+class Client:
+    """One simulated user: a keep-alive connection and a session cookie."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookie = None
+        self.conn = None
+
+    def request(self, method, path, form=None):
+        body = urlencode(form).encode() if form is not None else None
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'} if form is not None else {}
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        return response.status, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+# =====================================================
+# OPERATIONS
+# =====================================================
+# Each returns an outcome label; anything unexpected raises and counts as an error
+
+def op_login(client, rng, ctx):
+    status, _ = client.request('POST', '/login', {
+        'username': f'user{rng.randint(1, ctx["users"])}', 'password': DEFAULT_PASSWORD
+    })
+    if status != 302:
+        raise RuntimeError(f'HTTP {status}')
+    return 'ok'
+
+
+def op_events(client, rng, ctx):
+    status, _ = client.request('GET', '/events')
+    if status != 200:
+        raise RuntimeError(f'HTTP {status}')
+    return 'ok'
+
+
+class ServerError(RuntimeError):
+    """A 5xx response; counted separately by the invariant checks."""
+
+
+def op_register(client, rng, ctx):
+    status, _ = client.request('POST', '/register', {
+        'username': f'load{rng.randrange(ctx["signup_pool"])}', 'password': 'load-test'
+    })
+    if status >= 500:
+        raise ServerError(f'HTTP {status}')
+    if status != 302:
+        raise RuntimeError(f'HTTP {status}')
+    return 'ok'
+
+
+def op_allocate(client, rng, ctx):
+    resource_ids = rng.sample(range(1, ctx['resources'] + 1), rng.choice([1, 1, 2]))
+    form = [('event_id', rng.randint(1, ctx['events']))] + [('resource_id', r) for r in resource_ids]
+    status, body = client.request('POST', '/allocate', form)
+    if status != 200:
+        raise RuntimeError(f'HTTP {status}')
+    return 'conflict' if b'Already booked' in body else 'booked'
+
+
+OPERATIONS = {
+    'login': op_login,
+    'events': op_events,
+    'register': op_register,
+    'allocate': op_allocate,
+}
+
+
+def parse_mix(spec):
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f'Unknown operation in --mix: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# =====================================================
+# DRIVER
+# =====================================================
+def run_level(base_url, concurrency, duration, mix, ctx, seed):
+    """Run ``concurrency`` simulated users for ``duration`` seconds."""
+    names, weights = list(mix), list(mix.values())
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'outcomes': defaultdict(int), 'messages': defaultdict(int)})
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(index):
+        rng = random.Random(seed * 100003 + index)
+        client = Client(base_url)
+        local = []
+
+        def attempt(name):
+            started = time.perf_counter()
+            try:
+                outcome, error = OPERATIONS[name](client, rng, ctx), None
+            except Exception as e:
+                outcome, error = None, f'{type(e).__name__}: {e}'
+                # Don't reuse a connection left in an unknown state
+                client.close()
+            local.append((name, time.perf_counter() - started, outcome, error))
+
+        try:
+            # Every simulated user starts signed in, like a browser session would
+            attempt('login')
+            while time.perf_counter() < deadline:
+                attempt(rng.choices(names, weights)[0])
+        finally:
+            client.close()
+        with lock:
+            for name, latency, outcome, error in local:
+                entry = results[name]
+                entry['latencies'].append(latency)
+                if error:
+                    entry['errors'] += 1
+                    entry['messages'][error[:80]] += 1
+                else:
+                    entry['outcomes'][outcome] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - started
+
+
+def print_level(concurrency, results, wall):
+    total = sum(len(r['latencies']) for r in results.values())
+    errors = sum(r['errors'] for r in results.values())
+    print(f'\nconcurrency {concurrency}: {total} requests in {wall:.1f}s = {total / wall:.1f} req/s, '
+          f'{errors} errors ({errors / total:.1%})' if total else f'\nconcurrency {concurrency}: no requests completed')
+    print(f"{'operation':<10} {'count':>7} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  outcomes")
+    for name in sorted(results):
+        r = results[name]
+        latencies = sorted(r['latencies'])
+        outcomes = ', '.join(f'{k}={v}' for k, v in sorted(r['outcomes'].items()))
+        print(f"{name:<10} {len(latencies):>7} {len(latencies) / wall:>8.1f} {r['errors']:>7} "
+              f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+              f"{percentile(latencies, 99) * 1000:>9.1f}  {outcomes}")
+        for message, count in sorted(r['messages'].items(), key=lambda m: -m[1])[:3]:
+            print(f'{"":<10} {count:>7} x {message}')
+
+
+# =====================================================
+# INVARIANTS
+# =====================================================
+def signup_server_errors(results):
+    """Number of register requests answered with a 5xx in one level's results."""
+    messages = results['register']['messages'] if 'register' in results else {}
+    return sum(count for message, count in messages.items() if message.startswith('ServerError'))
+
+
+def check_invariants(database_url):
+    """Returns a list of human-readable violations (empty when consistent)."""
+    from sqlalchemy import create_engine, text
+
+    from utils.conflict_checker import peak_concurrency
+
+    engine = create_engine(database_url)
+    violations = []
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            'SELECT r.resource_id, r.capacity, r.buffer_before_minutes, r.buffer_after_minutes, '
+            '       e.event_id, e.start_time, e.end_time '
+            'FROM event_resource_allocations a '
+            'JOIN resources r ON r.resource_id = a.resource_id '
+            'JOIN events e ON e.event_id = a.event_id'
+        )).all()
+
+        by_resource = defaultdict(list)
+        limits = {}
+        for resource_id, capacity, before, after, event_id, start, end in rows:
+            if isinstance(start, str):
+                start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+            limits[resource_id] = capacity or 1
+            by_resource[resource_id].append((
+                start - timedelta(minutes=before or 0), end + timedelta(minutes=after or 0), event_id
+            ))
+
+        for resource_id, intervals in by_resource.items():
+            lo = min(i[0] for i in intervals)
+            hi = max(i[1] for i in intervals)
+            peak, holders = peak_concurrency(intervals, lo, hi)
+            if peak > limits[resource_id]:
+                violations.append(
+                    f'resource {resource_id} double-booked: {peak} events at once '
+                    f'(capacity {limits[resource_id]}): {sorted(holders)}'
+                )
+
+    engine.dispose()
+    return violations
+
+
+# =====================================================
+# SERVER
+# =====================================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_path, port):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.abspath(database_path),
+        # Measure the app, not the throttle
+        'RATE_LIMIT_ENABLED': 'false',
+    })
+    code = f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)"
+    server = subprocess.Popen([sys.executable, '-c', code], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit('Server exited during start-up')
+        try:
+            status, _ = Client(f'http://127.0.0.1:{port}', timeout=2).request('GET', '/login')
+            if status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit('Server did not start within 30s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--url', help='target an already running server instead of starting one')
+    parser.add_argument('--database-url', help='database of the --url server, for invariant checks')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--duration', type=float, default=15, help='seconds per concurrency level')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'operation weights (default {DEFAULT_MIX})')
+    parser.add_argument('--signup-pool', type=int, default=200, help='distinct names used by register')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    ctx = {'users': args.users, 'events': args.events, 'resources': args.resources, 'signup_pool': args.signup_pool}
+
+    server = None
+    if args.url:
+        if not args.database_url:
+            parser.error('--database-url is required with --url')
+        base_url, database_url = args.url, args.database_url
+    else:
+        _, counts = seed_from_args(args)
+        print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
+        port = free_port()
+        server = start_server(args.database, port)
+        base_url = f'http://127.0.0.1:{port}'
+        database_url = 'sqlite:///' + os.path.abspath(args.database)
+
+    signup_errors = 0
+    try:
+        for concurrency in args.concurrency:
+            results, wall = run_level(base_url, concurrency, args.duration, mix, ctx, args.seed)
+            print_level(concurrency, results, wall)
+            signup_errors += signup_server_errors(results)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    violations = check_invariants(database_url)
+    if signup_errors:
+        violations.append(f'{signup_errors} sign-up(s) failed with a server error')
+    if violations:
+        print(f'\n{len(violations)} invariant violation(s):')
+        for violation in violations[:50]:
+            print('  ' + violation)
+        sys.exit(1)
+    print('\nInvariants hold: no resource over capacity, no sign-up failed with a server error.')
+
+
+if __name__ == '__main__':
+    main()
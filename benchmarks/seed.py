@@ -0,0 +1,117 @@
+"""
+Synthetic data generator for benchmarks and load tests.
+
+    python -m benchmarks.seed --database /tmp/bench.db --events 20000
+
+Events are spread over ``--days`` with ``--events-per-day`` controlling how
+densely they overlap. Allocations never double-book a resource, matching
+what the conflict check allows in production.
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+RESOURCE_TYPES = ['Venue', 'Equipment', 'Staff', 'Vehicle']
+DEFAULT_PASSWORD = 'benchmark'
+
+
+def seed_database(app, users=100, events=5000, resources=50, events_per_day=40,
+                  resources_per_event=2, seed=42, start=None):
+    """Populate the database bound to ``app`` with synthetic rows."""
+    from models import db, User, Event, Resource, EventResourceAllocation
+
+    rng = random.Random(seed)
+    start = start or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+    days = max(1, events // max(1, events_per_day))
+    # Hash once: hashing is deliberately slow and irrelevant to what we measure
+    password_hash = generate_password_hash(DEFAULT_PASSWORD)
+
+    with app.app_context():
+        db.create_all()
+
+        db.session.execute(db.insert(User), [
+            {'user_id': i, 'username': f'user{i}', 'password_hash': password_hash}
+            for i in range(1, users + 1)
+        ])
+        db.session.execute(db.insert(Resource), [
+            {'resource_id': i, 'resource_name': f'Resource {i}', 'resource_type': rng.choice(RESOURCE_TYPES)}
+            for i in range(1, resources + 1)
+        ])
+
+        event_rows = []
+        for i in range(1, events + 1):
+            begins = start + timedelta(days=rng.randrange(days), minutes=rng.randrange(8 * 60, 20 * 60, 15))
+            event_rows.append({
+                'event_id': i,
+                'user_id': rng.randint(1, users),
+                'title': f'Event {i}',
+                'start_time': begins,
+                'end_time': begins + timedelta(minutes=rng.choice([30, 60, 90, 120, 240])),
+                'description': 'Synthetic benchmark event',
+            })
+        db.session.execute(db.insert(Event), event_rows)
+
+        # Greedy assignment in start order keeps every resource conflict free
+        busy_until = {}
+        allocation_rows = []
+        for row in sorted(event_rows, key=lambda r: r['start_time']):
+            wanted = rng.randint(1, resources_per_event)
+            for resource_id in rng.sample(range(1, resources + 1), min(resources, wanted * 3)):
+                if wanted == 0:
+                    break
+                if busy_until.get(resource_id, datetime.min) <= row['start_time']:
+                    busy_until[resource_id] = row['end_time']
+                    allocation_rows.append({'event_id': row['event_id'], 'resource_id': resource_id})
+                    wanted -= 1
+        if allocation_rows:
+            db.session.execute(db.insert(EventResourceAllocation), allocation_rows)
+
+        db.session.commit()
+
+    return {'users': users, 'events': events, 'resources': resources, 'allocations': len(allocation_rows)}
+
+
+def create_app_for(database_path):
+    """Import the application bound to a fresh SQLite file at ``database_path``."""
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(database_path)
+    # Measure the app, not the throttle: benchmarks fire far more requests than any limit allows
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'
+    from app import app
+    return app
+
+
+def add_arguments(parser):
+    parser.add_argument('--database', default='bench.db', help='SQLite file to (re)create')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--resources', type=int, default=50)
+    parser.add_argument('--events-per-day', type=int, default=40,
+                        help='higher values mean more overlapping events')
+    parser.add_argument('--resources-per-event', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def seed_from_args(args):
+    app = create_app_for(args.database)
+    counts = seed_database(
+        app,
+        users=args.users,
+        events=args.events,
+        resources=args.resources,
+        events_per_day=args.events_per_day,
+        resources_per_event=args.resources_per_event,
+        seed=args.seed,
+    )
+    return app, counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    _, counts = seed_from_args(parser.parse_args())
+    print('Seeded', ', '.join(f'{v} {k}' for k, v in counts.items()))
@@ -11,4 +11,48 @@ class Config:
     SQLALCHEMY_ECHO = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5000').split(',')
\ No newline at end of file
+    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5000').split(',')
+    # Bring an existing database's tables up to date when the app starts
+    AUTO_UPGRADE_DB = os.environ.get('AUTO_UPGRADE_DB', 'true').lower() == 'true'
+    # Events that ended more than this many days ago are moved to the archive tables
+    ARCHIVE_HORIZON_DAYS = int(os.environ.get('ARCHIVE_HORIZON_DAYS', 90))
+    # Request timing / SQL profiling (exposed on /metrics)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILING_DEBUG_HEADERS = os.environ.get('PROFILING_DEBUG_HEADERS', 'false').lower() == 'true'
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))
+    # Connections held by the native async API (asgi.py)
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 8))
+    # Messages buffered per change-feed subscriber before it is told to reload
+    CHANGE_FEED_BUFFER = int(os.environ.get('CHANGE_FEED_BUFFER', 256))
+    # Deletions are remembered this long; older sync tokens get a full snapshot
+    SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+    # gzip/brotli response compression for bodies of at least COMPRESSION_MIN_SIZE bytes
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    # How far ahead to look for an alternative slot when a booking conflicts
+    BOOKING_SEARCH_HORIZON_DAYS = int(os.environ.get('BOOKING_SEARCH_HORIZON_DAYS', 30))
+    # Number of alternative slots suggested when a single-resource booking conflicts
+    ALTERNATIVE_SLOT_COUNT = int(os.environ.get('ALTERNATIVE_SLOT_COUNT', 3))
+    # Background jobs: concurrent workers and maximum queued + running jobs
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 20))
+    # Jobs whose worker misses four heartbeats in a row are marked failed
+    JOB_HEARTBEAT_SECONDS = int(os.environ.get('JOB_HEARTBEAT_SECONDS', 15))
+    # Worker processes used to compute utilization reports (1 = in-process)
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 1))
+    # Token-bucket rate limits per user (or client address on public endpoints).
+    # RATE_LIMITS gives endpoints their own bucket; all others share RATE_LIMIT_DEFAULT.
+    # RATE_LIMIT_STORE is a SQLite file shared by worker processes; empty keeps buckets in memory.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_DEFAULT = os.environ.get('RATE_LIMIT_DEFAULT', '300/minute')
+    RATE_LIMITS = os.environ.get(
+        'RATE_LIMITS',
+        'events.register_for_event=20/minute,events.allocate_resource=30/minute,'
+        'events.allocate_resources=30/minute,allocate_resource=30/minute,'
+        'events.get_events=120/minute,events=120/minute,api.get_events=120/minute'
+    )
+    RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', '')
+    # Timezone for event times entered without an offset or explicit timezone
+    DEFAULT_TIMEZONE = os.environ.get('DEFAULT_TIMEZONE', 'UTC')
+    # Rendered .ics calendar feeds kept in memory (one per user or resource feed)
+    ICAL_CACHE_SIZE = int(os.environ.get('ICAL_CACHE_SIZE', 256))
\ No newline at end of file
@@ -1,7 +1,11 @@
+import secrets
 from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from utils.timezones import to_local
+
 # -------------------------------------------------
 # Database Initialization
 # -------------------------------------------------
@@ -16,6 +20,8 @@ class User(db.Model):
     user_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
+    # Secret in the user's calendar feed URLs (calendar apps can't log in)
+    calendar_token = db.Column(db.String(64), unique=True, index=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -23,6 +29,11 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def ensure_calendar_token(self):
+        if not self.calendar_token:
+            self.calendar_token = secrets.token_urlsafe(32)
+        return self.calendar_token
+
     def __repr__(self):
         return f"<User {self.username}>"
 
@@ -35,14 +46,18 @@ class Event(db.Model):
 
     event_id = db.Column(db.Integer, primary_key=True)
     # Reference to the user who created the event
-    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True, index=True)
 
     # Relationship to easily access the owner
     user = db.relationship('User', backref='events')
     title = db.Column(db.String(100), nullable=False)
+    # Stored as naive UTC; ``timezone`` is the IANA zone the event was scheduled in
     start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=False)
+    timezone = db.Column(db.String(64), nullable=False, default='UTC')
     description = db.Column(db.Text)
+    # Change tracking for delta sync (see utils.sync)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     allocations = db.relationship(
         'EventResourceAllocation',
@@ -50,10 +65,42 @@ class Event(db.Model):
         cascade='all, delete-orphan'
     )
 
+    __table_args__ = (
+        # Overlap checks filter on both ends of the time range
+        db.Index('ix_events_time_range', 'start_time', 'end_time'),
+        # Never reuse the id of a deleted/archived row: archived_events keeps it
+        {'sqlite_autoincrement': True},
+    )
+
+    @property
+    def local_start_time(self):
+        return to_local(self.start_time, self.timezone)
+
+    @property
+    def local_end_time(self):
+        return to_local(self.end_time, self.timezone)
+
+    def to_dict(self, fields=None):
+        return {name: getattr(self, name) for name in (fields or EVENT_JSON_COLUMNS)}
+
     def __repr__(self):
         return f"<Event {self.title}>"
 
 
+# Columns exposed by the JSON API, in output order. Listing endpoints select
+# just these columns instead of loading full Event instances.
+EVENT_JSON_COLUMNS = {
+    'event_id': Event.event_id,
+    'user_id': Event.user_id,
+    'title': Event.title,
+    'start_time': Event.start_time,
+    'end_time': Event.end_time,
+    'timezone': Event.timezone,
+    'description': Event.description,
+    'updated_at': Event.updated_at,
+}
+
+
 # -------------------------------------------------
 # Resource Model
 # -------------------------------------------------
@@ -63,6 +110,12 @@ class Resource(db.Model):
     resource_id = db.Column(db.Integer, primary_key=True)
     resource_name = db.Column(db.String(100), nullable=False)
     resource_type = db.Column(db.String(50), nullable=False)
+    # How many events may hold the resource at the same time
+    capacity = db.Column(db.Integer, nullable=False, default=1)
+    # Setup / cleanup time blocked around every booking
+    buffer_before_minutes = db.Column(db.Integer, nullable=False, default=0)
+    buffer_after_minutes = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     allocations = db.relationship(
         'EventResourceAllocation',
@@ -82,11 +135,98 @@ class EventResourceAllocation(db.Model):
 
     allocation_id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.event_id'), nullable=False)
-    resource_id = db.Column(db.Integer, db.ForeignKey('resources.resource_id'), nullable=False)
+    resource_id = db.Column(db.Integer, db.ForeignKey('resources.resource_id'), nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     __table_args__ = (
         db.UniqueConstraint('event_id', 'resource_id', name='unique_event_resource'),
+        # Never reuse the id of a deleted/archived row: archived_allocations keeps it
+        {'sqlite_autoincrement': True},
     )
 
     def __repr__(self):
         return f"<Allocation Event:{self.event_id} Resource:{self.resource_id}>"
+
+
+# -------------------------------------------------
+# Tombstone Model
+# -------------------------------------------------
+# One row per deleted event/resource/allocation so sync clients can learn
+# about deletions. Old tombstones are purged by utils.sync.purge_tombstones.
+class Tombstone(db.Model):
+    __tablename__ = 'tombstones'
+
+    tombstone_id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<Tombstone {self.table_name}:{self.row_id}>"
+
+
+# -------------------------------------------------
+# Background Job Model
+# -------------------------------------------------
+# Long reports and maintenance tasks run by utils.jobs. Params and results
+# are stored as JSON text so finished results can be downloaded later.
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    job_id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    # queued -> running -> done | failed
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    params = db.Column(db.Text)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # Process that owns the job and when it last reported being alive
+    worker_id = db.Column(db.String(80), index=True)
+    heartbeat_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<Job {self.job_id} {self.kind} {self.status}>"
+
+
+# -------------------------------------------------
+# Archive Models
+# -------------------------------------------------
+# Past events and their allocations are moved here by utils.archive so that
+# the hot tables above only hold current data. Rows keep their original ids.
+class ArchivedEvent(db.Model):
+    __tablename__ = 'archived_events'
+
+    event_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    title = db.Column(db.String(100), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False, index=True)
+    end_time = db.Column(db.DateTime, nullable=False)
+    timezone = db.Column(db.String(64), nullable=False, default='UTC')
+    description = db.Column(db.Text)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    allocations = db.relationship(
+        'ArchivedAllocation',
+        backref='event',
+        cascade='all, delete-orphan'
+    )
+
+    def __repr__(self):
+        return f"<ArchivedEvent {self.title}>"
+
+
+class ArchivedAllocation(db.Model):
+    __tablename__ = 'archived_allocations'
+
+    allocation_id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('archived_events.event_id'), nullable=False)
+    # No foreign key: the resource may be deleted long after the booking was archived
+    resource_id = db.Column(db.Integer, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ArchivedAllocation Event:{self.event_id} Resource:{self.resource_id}>"
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import math
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from urllib.parse import parse_qs
+
+import aiosqlite
+
+from utils.serialization import dumps_bytes, parse_fields
+
+# SQLAlchemy stores SQLite DATETIME columns as text in this format, so range
+# filters can be compared as plain strings and still use the indexes
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Event columns the API can return (same names and order as models.EVENT_JSON_COLUMNS)
+EVENT_FIELDS = ('event_id', 'user_id', 'title', 'start_time', 'end_time', 'timezone', 'description', 'updated_at')
+TIMESTAMP_FIELDS = {'start_time', 'end_time', 'updated_at'}
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# =====================================================
+# CONNECTION POOL
+# =====================================================
+class ConnectionPool:
+    """Small fixed-size pool of aiosqlite connections opened on first use."""
+
+    def __init__(self, database, size=8):
+        self.database = database
+        self.size = size
+        self._idle = asyncio.Queue()
+        self._opened = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self._idle.empty() and self._opened < self.size:
+            async with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = await aiosqlite.connect(f'file:{self.database}?mode=ro', uri=True)
+                    conn.row_factory = aiosqlite.Row
+                    return conn
+        return await self._idle.get()
+
+    def release(self, conn):
+        self._idle.put_nowait(conn)
+
+    async def fetchall(self, sql, params=()):
+        conn = await self.acquire()
+        try:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+        finally:
+            self.release(conn)
+
+    async def close(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+        self._opened = 0
+        # Fresh primitives so the pool can be reused from a new event loop
+        self._idle = asyncio.Queue()
+        self._lock = asyncio.Lock()
+
+
+# =====================================================
+# HELPERS
+# =====================================================
+def parse_datetime(value, name):
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPError(400, f'Invalid {name}!')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(SQLITE_DATETIME_FORMAT)
+
+
+def parse_date(value, name):
+    """Calendar date of ``2024-05-01`` (or of a full ISO timestamp)."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        raise HTTPError(400, f'Invalid {name}!')
+
+
+def to_iso(value):
+    # Stored timestamps are naive UTC
+    return value.replace(' ', 'T') + '+00:00' if value else None
+
+
+def parse_event_fields(args):
+    """Sparse fieldsets: ``?fields=title,start_time`` selects just those columns."""
+    try:
+        return parse_fields(args.get('fields'), EVENT_FIELDS)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def event_row_to_dict(row, fields):
+    return {name: to_iso(row[name]) if name in TIMESTAMP_FIELDS else row[name] for name in fields}
+
+
+# =====================================================
+# HANDLERS
+# =====================================================
+async def get_events(pool, args):
+    fields = parse_event_fields(args)
+    where = []
+    params = []
+
+    if args.get('start_date'):
+        where.append('start_time >= ?')
+        params.append(parse_datetime(args['start_date'], 'start_date'))
+    if args.get('end_date'):
+        where.append('start_time <= ?')
+        params.append(parse_datetime(args['end_date'], 'end_date'))
+
+    sort_by = 'title' if args.get('sort_by') == 'title' else 'start_time'
+    sort_order = 'DESC' if args.get('sort_order', 'asc').lower() == 'desc' else 'ASC'
+
+    try:
+        page = max(1, int(args.get('page', 1)))
+        per_page = max(1, min(int(args.get('per_page', 10)), 100))
+    except ValueError:
+        raise HTTPError(400, 'Invalid pagination parameters!')
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+    rows, total = await asyncio.gather(
+        pool.fetchall(
+            f"SELECT {', '.join(fields)} FROM events "
+            f'{where_sql} ORDER BY {sort_by} {sort_order}, event_id LIMIT ? OFFSET ?',
+            params + [per_page, (page - 1) * per_page]
+        ),
+        pool.fetchall(f'SELECT COUNT(*) FROM events {where_sql}', params),
+    )
+    total = total[0][0]
+
+    return 200, {
+        'events': [event_row_to_dict(row, fields) for row in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+    }
+
+
+async def get_event(pool, args, event_id):
+    fields = parse_event_fields(args)
+    rows = await pool.fetchall(f"SELECT {', '.join(fields)} FROM events WHERE event_id = ?", (event_id,))
+    if not rows:
+        raise HTTPError(404, 'Event not found!')
+    return 200, event_row_to_dict(rows[0], fields)
+
+
+async def resource_utilization_report(pool, args):
+    """
+    Same figures as utils.reports.utilization_report: hours and bookings of
+    events starting within [start_date, end_date] (whole days, archived
+    bookings included) and upcoming bookings from tomorrow on.
+    """
+    window = []
+    params = []
+    if args.get('start_date'):
+        window.append('{column} >= ?')
+        params.append(parse_date(args['start_date'], 'start_date').strftime(SQLITE_DATETIME_FORMAT))
+    if args.get('end_date'):
+        window.append('{column} < ?')
+        params.append((parse_date(args['end_date'], 'end_date') + timedelta(days=1)).strftime(SQLITE_DATETIME_FORMAT))
+    in_window = ' AND '.join(['b.start_time IS NOT NULL'] + window).format(column='b.start_time')
+    archive_window = f"WHERE {' AND '.join(window)}".format(column='e.start_time') if window else ''
+    upcoming_from = datetime.combine(date.today() + timedelta(days=1), time.min).strftime(SQLITE_DATETIME_FORMAT)
+
+    rows = await pool.fetchall(
+        f'''
+        WITH bookings AS (
+            SELECT a.resource_id, e.start_time, e.end_time, 1 AS current
+            FROM event_resource_allocations a
+            JOIN events e ON e.event_id = a.event_id
+            UNION ALL
+            SELECT a.resource_id, e.start_time, e.end_time, 0 AS current
+            FROM archived_allocations a
+            JOIN archived_events e ON e.event_id = a.event_id
+            {archive_window}
+        )
+        SELECT r.resource_id, r.resource_name, r.resource_type,
+               COUNT(CASE WHEN {in_window} THEN 1 END) AS total_bookings,
+               COALESCE(SUM(CASE WHEN {in_window}
+                   THEN (julianday(b.end_time) - julianday(b.start_time)) * 24 END), 0) AS hours,
+               COUNT(CASE WHEN b.current = 1 AND b.start_time >= ? THEN 1 END) AS upcoming
+        FROM resources r
+        LEFT JOIN bookings b ON b.resource_id = r.resource_id
+        GROUP BY r.resource_id
+        ORDER BY r.resource_id
+        ''',
+        params + params + params + [upcoming_from]
+    )
+
+    return 200, [
+        {
+            'resource_name': row['resource_name'],
+            'resource_type': row['resource_type'],
+            'total_hours_utilized': round(row['hours'], 2),
+            'total_bookings': row['total_bookings'],
+            'upcoming_bookings': row['upcoming'],
+        }
+        for row in rows
+    ]
+
+
+ROUTES = [
+    ('GET', re.compile(r'^/api/events/?$'), get_events),
+    ('GET', re.compile(r'^/api/events/(?P<event_id>\d+)$'), get_event),
+    ('GET', re.compile(r'^/api/resources/utilization-report$'), resource_utilization_report),
+]
+
+
+# =====================================================
+# ASGI APPLICATION
+# =====================================================
+class AsyncAPI:
+    """
+    Native ASGI app for the read-heavy JSON endpoints. Paths it does not
+    know are passed to ``fallback`` (normally the Flask app wrapped for ASGI).
+    With a ``limiter`` (utils.ratelimit.RateLimiter), clients are throttled
+    by address; the endpoint name is ``api.<handler>``, e.g. ``api.get_events``.
+    """
+
+    def __init__(self, database, fallback, pool_size=8, limiter=None):
+        self.pool = ConnectionPool(database, pool_size)
+        self.fallback = fallback
+        self.limiter = limiter
+
+    async def check_rate_limit(self, handler, scope):
+        """None when the request may proceed, otherwise seconds for ``Retry-After``."""
+        if self.limiter is None:
+            return None
+        client = scope.get('client')
+        args = (f"ip:{client[0] if client else 'unknown'}", f'api.{handler.__name__}')
+        if self.limiter.store.blocking:
+            retry_after = await asyncio.to_thread(self.limiter.hit, *args)
+        else:
+            retry_after = self.limiter.hit(*args)
+        return None if retry_after is None else max(1, math.ceil(retry_after))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http':
+            for method, pattern, handler in ROUTES:
+                match = pattern.match(scope['path'])
+                if match and scope['method'] in (method, 'HEAD'):
+                    return await self.dispatch(handler, match, scope, send)
+
+        return await self.fallback(scope, receive, send)
+
+    async def dispatch(self, handler, match, scope, send):
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        args = {key: values[-1] for key, values in query.items()}
+        path_args = {key: int(value) for key, value in match.groupdict().items()}
+
+        headers = []
+        try:
+            retry_after = await self.check_rate_limit(handler, scope)
+            if retry_after is not None:
+                headers.append((b'retry-after', str(retry_after).encode()))
+                raise HTTPError(429, 'Rate limit exceeded, try again later.')
+            status, payload = await handler(self.pool, args, **path_args)
+        except HTTPError as e:
+            status, payload = e.status, {'message': e.message}
+        except Exception:
+            # Details go to the log, not to the client
+            logger.exception('Unhandled error in %s %s', scope['method'], scope['path'])
+            status, payload = 500, {'message': 'Internal server error'}
+
+        body = dumps_bytes(payload)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                *headers,
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.pool.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
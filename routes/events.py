@@ -1,14 +1,22 @@
 from flask import Blueprint, request, jsonify, g
-from datetime import datetime
+from datetime import datetime, timedelta
 from models import (
     db,
     Event,
     EventAttendee,
     Resource,
-    EventResourceAllocation
+    EventResourceAllocation,
+    EVENT_JSON_COLUMNS
 )
-from utils.helpers import token_required, admin_required
-from utils.conflict_checker import has_resource_conflict
+from utils.helpers import token_required, admin_required, rate_limited
+from utils.conflict_checker import (
+    book_resources,
+    free_resources_of_type,
+    nearest_free_windows
+)
+from config import Config
+from utils.serialization import parse_fields, rows_to_dicts, select_fields
+from utils.timezones import get_zone, parse_datetime, utc_isoformat
 
 events_bp = Blueprint('events', __name__)
 
@@ -16,6 +24,7 @@ events_bp = Blueprint('events', __name__)
 # GET ALL EVENTS
 # =====================================================
 @events_bp.route('/', methods=['GET'])
+@rate_limited
 def get_events():
     try:
         category = request.args.get('category')
@@ -42,14 +51,14 @@ def get_events():
 
         if start_date:
             try:
-                start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+                start = parse_datetime(start_date)
                 query = query.filter(Event.start_time >= start)
             except ValueError:
                 pass
 
         if end_date:
             try:
-                end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+                end = parse_datetime(end_date)
                 query = query.filter(Event.start_time <= end)
             except ValueError:
                 pass
@@ -68,6 +77,15 @@ def get_events():
             sort_column.desc() if sort_order.lower() == 'desc' else sort_column.asc()
         )
 
+        # Sparse fieldsets: ?fields=title,start_time
+        try:
+            fields = parse_fields(request.args.get('fields'), EVENT_JSON_COLUMNS)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        # Select plain column tuples rather than full ORM instances
+        query = select_fields(query, EVENT_JSON_COLUMNS, fields)
+
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 10)), 100)
 
@@ -76,7 +94,7 @@ def get_events():
         )
 
         return jsonify({
-            'events': [event.to_dict() for event in paginated_events.items],
+            'events': rows_to_dicts(paginated_events.items, fields),
             'total': paginated_events.total,
             'page': paginated_events.page,
             'per_page': paginated_events.per_page,
@@ -91,6 +109,7 @@ def get_events():
 # GET SINGLE EVENT
 # =====================================================
 @events_bp.route('/<int:event_id>', methods=['GET'])
+@rate_limited
 def get_event(event_id):
     event = Event.query.get_or_404(event_id)
     return jsonify(event.to_dict()), 200
@@ -108,8 +127,14 @@ def create_event():
         if not data.get('title') or not data.get('start_time') or not data.get('end_time'):
             return jsonify({'message': 'Missing required fields!'}), 400
 
-        start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-        end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+        # Times without an offset are wall-clock times in the event's timezone
+        tz_name = data.get('timezone') or Config.DEFAULT_TIMEZONE
+        try:
+            get_zone(tz_name)
+            start_time = parse_datetime(data['start_time'], tz_name)
+            end_time = parse_datetime(data['end_time'], tz_name)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
 
         if start_time >= end_time:
             return jsonify({'message': 'End time must be after start time!'}), 400
@@ -119,6 +144,7 @@ def create_event():
             description=data.get('description', ''),
             start_time=start_time,
             end_time=end_time,
+            timezone=tz_name,
             location=data.get('location'),
             category=data.get('category'),
             max_attendees=data.get('max_attendees'),
@@ -156,10 +182,17 @@ def update_event(event_id):
             if field in data:
                 setattr(event, field, data[field])
 
-        if 'start_time' in data:
-            event.start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-        if 'end_time' in data:
-            event.end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+        try:
+            if data.get('timezone'):
+                get_zone(data['timezone'])
+                event.timezone = data['timezone']
+            if 'start_time' in data:
+                event.start_time = parse_datetime(data['start_time'], event.timezone)
+            if 'end_time' in data:
+                event.end_time = parse_datetime(data['end_time'], event.timezone)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 400
 
         if event.start_time >= event.end_time:
             return jsonify({'message': 'End time must be after start time!'}), 400
@@ -265,32 +298,39 @@ def allocate_resource(event_id):
     event = Event.query.get_or_404(event_id)
     resource = Resource.query.get_or_404(resource_id)
 
-    conflict_event = has_resource_conflict(
-        resource_id,
-        event.start_time,
-        event.end_time
-    )
-
-    if conflict_event:
+    _, conflicts = book_resources(event, [resource.resource_id])
+
+    if conflicts:
+        conflict_event = conflicts[resource.resource_id][0]
+        # Suggest other slots for this resource and other free resources of the same type
+        windows = nearest_free_windows(
+            resource,
+            event.start_time,
+            event.end_time,
+            count=Config.ALTERNATIVE_SLOT_COUNT,
+            horizon=timedelta(days=Config.BOOKING_SEARCH_HORIZON_DAYS),
+            not_before=datetime.utcnow(),
+            exclude_event_id=event.event_id
+        )
         return jsonify({
             'message': 'Resource conflict detected!',
-            'resource': resource.name,
+            'resource': resource.resource_name,
             'conflicting_event': conflict_event.title,
-            'conflict_time': f'{conflict_event.start_time} - {conflict_event.end_time}'
+            'conflict_time': f'{conflict_event.start_time} - {conflict_event.end_time}',
+            'alternative_slots': [
+                {'start_time': utc_isoformat(start), 'end_time': utc_isoformat(end)}
+                for start, end in windows
+            ],
+            'alternative_resources': [
+                {'resource_id': r.resource_id, 'resource_name': r.resource_name}
+                for r in free_resources_of_type(resource, event.start_time, event.end_time)
+            ]
         }), 400
 
-    allocation = EventResourceAllocation(
-        event_id=event.event_id,
-        resource_id=resource.resource_id
-    )
-
-    db.session.add(allocation)
-    db.session.commit()
-
     return jsonify({
         'message': 'Resource allocated successfully!',
         'event': event.title,
-        'resource': resource.name
+        'resource': resource.resource_name
     }), 200
 
 
@@ -312,8 +352,8 @@ def list_allocations():
                 'allocation_id': alloc.allocation_id,
                 'event_id': event.event_id if event else None,
                 'event_title': event.title if event else 'Deleted event',
-                'event_start': event.start_time.isoformat() if event and getattr(event, 'start_time', None) else None,
-                'event_end': event.end_time.isoformat() if event and getattr(event, 'end_time', None) else None,
+                'event_start': utc_isoformat(event.start_time) if event and getattr(event, 'start_time', None) else None,
+                'event_end': utc_isoformat(event.end_time) if event and getattr(event, 'end_time', None) else None,
                 'event_description': event.description if event and getattr(event, 'description', None) else None,
                 'resource_id': resource.resource_id if resource else None,
                 'resource_name': resource.resource_name if resource else 'Deleted resource',
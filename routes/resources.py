@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-from models import Resource, Event, EventResourceAllocation
+from config import Config
+from utils.reports import utilization_report
 
 resource_bp = Blueprint('resources', __name__)
 
@@ -9,43 +10,21 @@ def resource_utilization_report():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
 
-    start = datetime.fromisoformat(start_date) if start_date else None
-    end = datetime.fromisoformat(end_date) if end_date else None
-
-    report = []
-
-    resources = Resource.query.all()
-
-    for resource in resources:
-        allocations = EventResourceAllocation.query.filter_by(
-            resource_id=resource.id
-        ).all()
-
-        total_hours = 0
-        upcoming = 0
-
-        for alloc in allocations:
-            event = Event.query.get(alloc.event_id)
-            if not event:
-                continue
-
-            if start and event.start_time < start:
-                continue
-            if end and event.end_time > end:
-                continue
-
-            duration = (event.end_time - event.start_time).total_seconds() / 3600
-            total_hours += duration
-
-            if event.start_time > datetime.utcnow():
-                upcoming += 1
-
-        report.append({
-            'resource_name': resource.name,
-            'resource_type': resource.type,
-            'total_hours_utilized': round(total_hours, 2),
-            'total_bookings': len(allocations),
-            'upcoming_bookings': upcoming
-        })
+    start = datetime.fromisoformat(start_date).date() if start_date else None
+    end = datetime.fromisoformat(end_date).date() if end_date else None
+
+    # Aggregated per resource partition, in parallel when REPORT_WORKERS > 1
+    rows = utilization_report(start, end, workers=Config.REPORT_WORKERS)
+
+    report = [
+        {
+            'resource_name': row['name'],
+            'resource_type': row['type'],
+            'total_hours_utilized': row['hours'],
+            'total_bookings': row['bookings'],
+            'upcoming_bookings': row['upcoming']
+        }
+        for row in rows
+    ]
 
     return jsonify(report), 200
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py reads DATABASE_URL at import time, so point it at a scratch file first
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+
+@pytest.fixture
+def app():
+    from app import app as flask_app
+    from models import db
+
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    """Test client with a signed-in session (login_required only checks the session)."""
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session['user'] = 'tester'
+    return test_client
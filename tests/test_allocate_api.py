@@ -0,0 +1,116 @@
+from datetime import datetime
+
+import pytest
+
+from models import db, Event, Resource, EventResourceAllocation
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute)
+
+
+def make_resource(name='Room', resource_type='Venue'):
+    resource = Resource(resource_name=name, resource_type=resource_type)
+    db.session.add(resource)
+    db.session.commit()
+    return resource
+
+
+def make_event(start=at(10), end=at(11), title='Event'):
+    event = Event(title=title, start_time=start, end_time=end)
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def allocate(client, event, payload):
+    return client.post(f'/events/{event.event_id}/allocate-resources', json=payload)
+
+
+def test_books_explicit_ids_and_types(client):
+    room = make_resource('Room')
+    projector = make_resource('Projector A', 'Projector')
+    event = make_event()
+
+    response = allocate(client, event, {'resource_ids': [room.resource_id], 'resource_types': {'Projector': 1}})
+    assert response.status_code == 201
+    assert sorted(a['resource_id'] for a in response.get_json()['allocations']) == sorted(
+        [room.resource_id, projector.resource_id]
+    )
+
+
+def test_conflict_books_nothing_and_reports_holder(client):
+    free, taken = make_resource('Free'), make_resource('Taken')
+    holder = make_event(title='Holder')
+    db.session.add(EventResourceAllocation(event_id=holder.event_id, resource_id=taken.resource_id))
+    db.session.commit()
+    event = make_event(at(10, 30), at(11, 30))
+
+    response = allocate(client, event, {'resource_ids': [free.resource_id, taken.resource_id]})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert [c['conflicting_event_id'] for c in body['conflicts']] == [holder.event_id]
+    assert body['earliest_available']['start_time'].startswith('2030-01-07T11:00')
+    assert EventResourceAllocation.query.filter_by(event_id=event.event_id).count() == 0
+
+
+def test_single_resource_conflict_suggests_slots_and_resources(client):
+    taken = make_resource('Hall A')
+    other = make_resource('Hall B')
+    make_resource('Projector A', 'Projector')
+    holder = make_event(title='Holder')
+    db.session.add(EventResourceAllocation(event_id=holder.event_id, resource_id=taken.resource_id))
+    db.session.commit()
+    event = make_event(at(10, 30), at(11, 30))
+
+    body = allocate(client, event, {'resource_ids': [taken.resource_id]}).get_json()
+    slots = [slot['start_time'][:16] for slot in body['alternative_slots']]
+    assert '2030-01-07T11:00' in slots  # right after the holder releases the hall
+    assert '2030-01-07T09:00' in slots  # right before it takes the hall
+    assert body['alternative_resources'] == [{'resource_id': other.resource_id, 'resource_name': 'Hall B'}]
+
+
+def test_type_shortfall(client):
+    make_resource('Projector A', 'Projector')
+    event = make_event()
+
+    response = allocate(client, event, {'resource_types': {'Projector': 2}})
+    assert response.status_code == 400
+    assert response.get_json()['shortfall'] == {'Projector': 1}
+    assert EventResourceAllocation.query.count() == 0
+
+
+@pytest.mark.parametrize('payload', [
+    {'resource_ids': '12'},
+    {'resource_ids': [True]},
+    {'resource_ids': [1.5]},
+    {'resource_ids': ['1']},
+    {'resource_types': ['Projector']},
+    {'resource_types': {'Projector': 1.5}},
+    {'resource_types': {'Projector': True}},
+    {'resource_types': {'Projector': 0}},
+    {},
+    [1, 2],
+])
+def test_bad_input_is_rejected(client, payload):
+    make_resource('1')
+    make_resource('2')
+    event = make_event()
+
+    response = allocate(client, event, payload)
+    assert response.status_code == 400
+    assert EventResourceAllocation.query.count() == 0
+
+
+def test_allocate_form_shows_the_same_suggestions(client):
+    taken = make_resource('Hall A')
+    make_resource('Hall B')
+    holder = make_event(title='Holder')
+    db.session.add(EventResourceAllocation(event_id=holder.event_id, resource_id=taken.resource_id))
+    db.session.commit()
+    event = make_event(at(10, 30), at(11, 30))
+
+    page = client.post('/allocate', data={'event_id': event.event_id, 'resource_id': taken.resource_id})
+    text = page.get_data(as_text=True)
+    assert 'Nearest free slots: 2030-01-07' in text
+    assert 'Other free Venue resources: Hall B.' in text
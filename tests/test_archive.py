@@ -0,0 +1,82 @@
+from datetime import date, datetime
+
+from models import db, Event, Resource, EventResourceAllocation, ArchivedEvent, ArchivedAllocation
+from utils.archive import archive_past_events, latest_archived_time
+from utils.reports import utilization_report
+
+
+def book(resource, title, start_time, end_time):
+    event = Event(title=title, start_time=start_time, end_time=end_time)
+    db.session.add(event)
+    db.session.flush()
+    db.session.add(EventResourceAllocation(event_id=event.event_id, resource_id=resource.resource_id))
+    db.session.commit()
+    return event.event_id
+
+
+def make_resource():
+    resource = Resource(resource_name='Hall', resource_type='Venue')
+    db.session.add(resource)
+    db.session.commit()
+    return resource
+
+
+# =====================================================
+# ARCHIVING
+# =====================================================
+
+def test_archive_moves_past_events_in_batches(app):
+    resource = make_resource()
+    old_ids = [book(resource, f'Old {i}', datetime(2000, 1, i + 1, 9), datetime(2000, 1, i + 1, 11)) for i in range(3)]
+    recent_id = book(resource, 'Recent', datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10))
+
+    assert archive_past_events(horizon_days=90, batch_size=2) == 3
+
+    assert [e.event_id for e in Event.query.all()] == [recent_id]
+    assert EventResourceAllocation.query.count() == 1
+    assert sorted(e.event_id for e in ArchivedEvent.query.all()) == old_ids
+    assert ArchivedAllocation.query.count() == 3
+    assert latest_archived_time() == datetime(2000, 1, 3, 11)
+    # Nothing left to move
+    assert archive_past_events(horizon_days=90) == 0
+
+
+def test_archived_ids_are_not_reused(app):
+    resource = make_resource()
+    old_id = book(resource, 'Old', datetime(2000, 1, 1, 9), datetime(2000, 1, 1, 10))
+    archive_past_events(horizon_days=90)
+
+    new_id = book(resource, 'New', datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10))
+    assert new_id > old_id
+    assert db.session.get(ArchivedEvent, old_id).title == 'Old'
+
+
+# =====================================================
+# REPORTS OVER HOT AND ARCHIVED ROWS
+# =====================================================
+
+def test_report_includes_archived_bookings(app):
+    resource = make_resource()
+    book(resource, 'Old', datetime(2000, 1, 1, 9), datetime(2000, 1, 1, 11))
+    book(resource, 'Upcoming', datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10))
+    before = utilization_report(None, None)
+
+    archive_past_events(horizon_days=90)
+
+    # Archiving moves rows but must not change the numbers
+    assert utilization_report(None, None) == before
+    [row] = before
+    assert (row['hours'], row['bookings'], row['upcoming']) == (3.0, 2, 1)
+
+
+def test_report_range_selects_hot_or_archived_rows(app):
+    resource = make_resource()
+    book(resource, 'Old', datetime(2000, 1, 1, 9), datetime(2000, 1, 1, 11))
+    book(resource, 'Upcoming', datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10))
+    archive_past_events(horizon_days=90)
+
+    [archived_only] = utilization_report(date(2000, 1, 1), date(2000, 1, 1))
+    assert (archived_only['hours'], archived_only['bookings']) == (2.0, 1)
+
+    [hot_only] = utilization_report(date(2030, 1, 1), date(2030, 1, 31))
+    assert (hot_only['hours'], hot_only['bookings']) == (1.0, 1)
@@ -0,0 +1,61 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+import routes.async_api as async_api
+from models import db, Event
+from routes.async_api import AsyncAPI
+
+
+def call(application, path, query=''):
+    """Send one GET through the ASGI app; returns (status, decoded JSON body)."""
+    async def run():
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': []}
+        await application(scope, receive, send)
+        await application.pool.close()
+        return messages[0]['status'], json.loads(messages[-1]['body'])
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def api(app):
+    db.session.add(Event(title='Standup', start_time=datetime(2030, 1, 7, 9), end_time=datetime(2030, 1, 7, 10)))
+    db.session.commit()
+    return AsyncAPI(db.engine.url.database, fallback=None)
+
+
+@pytest.mark.parametrize('query', ['', 'fields=', 'fields=,', 'fields=%20,%20'])
+def test_empty_fields_select_every_field(api, query):
+    status, body = call(api, '/api/events', query)
+    assert status == 200
+    assert list(body['events'][0]) == list(async_api.EVENT_FIELDS)
+
+
+def test_fields_select_and_dedupe(api):
+    status, body = call(api, '/api/events', 'fields=title,start_time,title')
+    assert status == 200
+    assert body['events'] == [{'title': 'Standup', 'start_time': '2030-01-07T09:00:00.000000+00:00'}]
+
+
+def test_unknown_field_is_a_400(api):
+    assert call(api, '/api/events', 'fields=title,password') == (400, {'message': 'Unknown field(s): password'})
+
+
+def test_unexpected_errors_are_not_leaked(api, monkeypatch, caplog):
+    async def broken(pool, args):
+        raise RuntimeError('near "FROM": syntax error')
+
+    monkeypatch.setattr(async_api, 'ROUTES', [('GET', async_api.re.compile(r'^/api/events/?$'), broken)])
+    assert call(api, '/api/events') == (500, {'message': 'Internal server error'})
+    assert 'syntax error' in caplog.text
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from models import db, Event, Resource, EventResourceAllocation, User
+from utils.archive import archive_past_events
+
+
+def make_feed_owner():
+    user = User(username='tester')
+    user.set_password('secret')
+    token = user.ensure_calendar_token()
+    resource = Resource(resource_name='Hall', resource_type='Venue')
+    db.session.add_all([user, resource])
+    db.session.commit()
+
+    events = [
+        Event(title='Old', start_time=datetime(2000, 1, 1, 9), end_time=datetime(2000, 1, 1, 10), user_id=user.user_id),
+        Event(title='Planning', start_time=datetime(2030, 1, 7, 9), end_time=datetime(2030, 1, 7, 10), user_id=user.user_id),
+        Event(title='Review', start_time=datetime(2030, 1, 8, 9), end_time=datetime(2030, 1, 8, 10), user_id=user.user_id),
+    ]
+    db.session.add_all(events)
+    db.session.flush()
+    db.session.add_all([
+        EventResourceAllocation(event_id=event.event_id, resource_id=resource.resource_id) for event in events
+    ])
+    db.session.commit()
+    return token, resource.resource_id, [event.event_id for event in events]
+
+
+def feed_urls(token, resource_id):
+    return [f'/calendar/{token}/events.ics', f'/calendar/{token}/resources/{resource_id}.ics']
+
+
+def etags(client, urls):
+    return [client.get(url).headers['ETag'] for url in urls]
+
+
+def test_feed_returns_304_for_matching_etag(client):
+    token, resource_id, _ = make_feed_owner()
+
+    for url in feed_urls(token, resource_id):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/calendar'
+        assert b'SUMMARY:Planning' in response.data
+        etag = response.headers['ETag']
+        assert etag.startswith('W/"')
+
+        cached = client.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+
+        assert client.get(url, headers={'If-None-Match': 'W/"stale"'}).status_code == 200
+
+
+def test_feed_etag_changes_on_edit(client):
+    token, resource_id, event_ids = make_feed_owner()
+    urls = feed_urls(token, resource_id)
+    before = etags(client, urls)
+
+    db.session.get(Event, event_ids[1]).title = 'Kick-off'
+    db.session.commit()
+
+    after = etags(client, urls)
+    assert all(old != new for old, new in zip(before, after))
+    for url, etag in zip(urls, before):
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'SUMMARY:Kick-off' in response.data
+
+
+def test_feed_etag_changes_on_delete(client):
+    token, resource_id, event_ids = make_feed_owner()
+    urls = feed_urls(token, resource_id)
+    before = etags(client, urls)
+
+    db.session.delete(db.session.get(Event, event_ids[2]))
+    db.session.commit()
+
+    after = etags(client, urls)
+    assert all(old != new for old, new in zip(before, after))
+    assert all(b'SUMMARY:Review' not in client.get(url).data for url in urls)
+
+
+def test_feed_etag_changes_on_archive(client):
+    token, resource_id, _ = make_feed_owner()
+    urls = feed_urls(token, resource_id)
+    before = etags(client, urls)
+
+    assert archive_past_events(horizon_days=90) == 1
+
+    after = etags(client, urls)
+    assert all(old != new for old, new in zip(before, after))
+    assert all(b'SUMMARY:Old' not in client.get(url).data for url in urls)
+
+
+def test_unknown_feed_token_is_404(client):
+    make_feed_owner()
+    assert client.get('/calendar/not-a-token/events.ics').status_code == 404
@@ -0,0 +1,201 @@
+import contextlib
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils.conflict_checker as conflict_checker
+from models import db, Event, Resource, EventResourceAllocation
+from utils.conflict_checker import (
+    book_resources,
+    earliest_bundle_window,
+    find_conflicts,
+    nearest_free_windows,
+    peak_concurrency,
+)
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute)
+
+
+def make_resource(capacity=1, before=0, after=0):
+    resource = Resource(
+        resource_name='Room', resource_type='Venue', capacity=capacity,
+        buffer_before_minutes=before, buffer_after_minutes=after
+    )
+    db.session.add(resource)
+    db.session.commit()
+    return resource
+
+
+def book(resource, start, end):
+    event = Event(title='Booked', start_time=start, end_time=end)
+    db.session.add(event)
+    db.session.flush()
+    db.session.add(EventResourceAllocation(event_id=event.event_id, resource_id=resource.resource_id))
+    db.session.commit()
+    return event
+
+
+# =====================================================
+# peak_concurrency
+# =====================================================
+def test_touching_intervals_do_not_overlap():
+    intervals = [(at(10), at(11), 'a'), (at(11), at(12), 'b')]
+    assert peak_concurrency(intervals, at(9), at(13)) == (1, ['a'])
+
+
+def test_overlapping_intervals_report_holders_at_peak():
+    intervals = [(at(10), at(12), 'a'), (at(11), at(13), 'b'), (at(12), at(14), 'c')]
+    peak, holders = peak_concurrency(intervals, at(9), at(15))
+    assert peak == 2
+    assert sorted(holders) == ['a', 'b']
+
+
+def test_intervals_outside_window_are_ignored():
+    intervals = [(at(8), at(9), 'a'), (at(12), at(13), 'b')]
+    assert peak_concurrency(intervals, at(9), at(12)) == (0, [])
+
+
+# =====================================================
+# find_conflicts
+# =====================================================
+def test_back_to_back_booking_is_not_a_conflict(app):
+    room = make_resource()
+    book(room, at(10), at(11))
+    assert find_conflicts([room.resource_id], at(11), at(12)) == {}
+    assert room.resource_id in find_conflicts([room.resource_id], at(10, 30), at(11, 30))
+
+
+def test_capacity_above_one_allows_overlap_until_full(app):
+    room = make_resource(capacity=2)
+    first = book(room, at(10), at(12))
+    assert find_conflicts([room.resource_id], at(11), at(13)) == {}
+
+    second = book(room, at(11), at(13))
+    conflicts = find_conflicts([room.resource_id], at(11, 30), at(12, 30))
+    assert sorted(e.event_id for e in conflicts[room.resource_id]) == [first.event_id, second.event_id]
+    # Only one booking is active from 12:00, so a third fits there
+    assert find_conflicts([room.resource_id], at(12), at(13)) == {}
+
+
+@pytest.mark.parametrize('start, end, conflict', [
+    # Existing booking occupies 09:30-11:00 once its 30 min setup is added
+    (at(11), at(12), True),          # our own setup (10:30-11:00) overlaps its slot
+    (at(11, 30), at(12, 30), False),  # our setup starts exactly when it ends
+    (at(8), at(9, 30), False),        # we end exactly when its setup starts
+    (at(8), at(9, 45), True),
+])
+def test_asymmetric_buffers(app, start, end, conflict):
+    room = make_resource(before=30, after=0)
+    book(room, at(10), at(11))
+    assert (room.resource_id in find_conflicts([room.resource_id], start, end)) is conflict
+
+
+# =====================================================
+# Slot search
+# =====================================================
+def test_nearest_free_windows_on_both_sides(app):
+    room = make_resource()
+    booking = book(room, at(10), at(12))
+
+    windows = nearest_free_windows(room, at(11), at(12), count=2, horizon=timedelta(days=1))
+    assert windows == [(at(9), at(10)), (at(12), at(13))]
+
+    # The slot after the booking is closer, so it comes first when only one is asked for
+    assert nearest_free_windows(room, at(11), at(12), count=1, horizon=timedelta(days=1)) == [(at(12), at(13))]
+    # The requesting event itself doesn't block its own alternatives
+    assert nearest_free_windows(
+        room, at(11), at(12), count=1, horizon=timedelta(days=1), exclude_event_id=booking.event_id
+    ) == []
+
+
+def test_nearest_free_windows_respect_not_before(app):
+    room = make_resource()
+    book(room, at(10), at(12))
+    windows = nearest_free_windows(
+        room, at(11), at(12), count=2, horizon=timedelta(days=1), not_before=at(10)
+    )
+    assert windows == [(at(12), at(13)), (at(13), at(14))]
+
+
+def test_earliest_bundle_window_with_different_buffers(app):
+    plain = make_resource()
+    padded = make_resource(before=15, after=30)
+    book(plain, at(10), at(11))
+    book(padded, at(10), at(11))
+
+    # plain frees at 11:00; padded frees at 11:30 and needs 15 min setup before the next booking
+    window = earliest_bundle_window(
+        [plain.resource_id, padded.resource_id], timedelta(hours=1), at(10), horizon=timedelta(days=1)
+    )
+    assert window == (at(11, 45), at(12, 45))
+
+
+def test_earliest_bundle_window_is_not_before_when_free(app):
+    plain = make_resource()
+    padded = make_resource(before=15, after=30)
+    book(padded, at(10), at(11))
+    window = earliest_bundle_window(
+        [plain.resource_id, padded.resource_id], timedelta(hours=1), at(13), horizon=timedelta(days=1)
+    )
+    assert window == (at(13), at(14))
+
+
+# =====================================================
+# book_resources
+# =====================================================
+def test_book_resources_is_all_or_nothing(app):
+    free, taken = make_resource(), make_resource()
+    book(taken, at(10), at(11))
+    event = Event(title='New', start_time=at(10, 30), end_time=at(11, 30))
+    db.session.add(event)
+    db.session.commit()
+
+    allocations, conflicts = book_resources(event, [free.resource_id, taken.resource_id])
+    assert allocations == []
+    assert list(conflicts) == [taken.resource_id]
+    assert EventResourceAllocation.query.filter_by(event_id=event.event_id).count() == 0
+
+
+def test_concurrent_sessions_cannot_double_book(app, monkeypatch):
+    """Two sessions (as in two worker processes) both pass the first check; only one may commit."""
+    resource = make_resource()
+    event_ids = []
+    for title in ('A', 'B'):
+        event = Event(title=title, start_time=at(10), end_time=at(11))
+        db.session.add(event)
+        db.session.commit()
+        event_ids.append(event.event_id)
+    resource_id = resource.resource_id
+
+    # The in-process lock would serialize the threads; take it out so only the database stands in the way
+    monkeypatch.setattr(conflict_checker, 'booking_lock', contextlib.nullcontext())
+    both_checked = threading.Barrier(2, timeout=5)
+    original = conflict_checker.booking_conflicts
+
+    def check_then_wait(event, resource_ids):
+        conflicts = original(event, resource_ids)
+        both_checked.wait()
+        return conflicts
+
+    monkeypatch.setattr(conflict_checker, 'booking_conflicts', check_then_wait)
+
+    results = {}
+
+    def attempt(event_id):
+        with app.app_context():
+            event = db.session.get(Event, event_id)
+            allocations, conflicts = book_resources(event, [resource_id])
+            results[event_id] = (len(allocations), list(conflicts))
+            db.session.remove()
+
+    threads = [threading.Thread(target=attempt, args=(event_id,)) for event_id in event_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert sorted(results.values()) == [(0, [resource_id]), (1, [])]
+    assert EventResourceAllocation.query.filter_by(resource_id=resource_id).count() == 1
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from models import db, Event, User
+
+
+@pytest.fixture
+def own_event(app):
+    user = User(username='tester')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    event = Event(
+        title='Standup', user_id=user.user_id, timezone='UTC',
+        start_time=datetime(2030, 1, 7, 9), end_time=datetime(2030, 1, 7, 10)
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_update_reads_times_in_the_event_timezone(client, own_event):
+    response = client.put(f'/api/events/{own_event.event_id}', json={
+        'title': 'Planning', 'start_time': '2030-07-01T10:00', 'end_time': '2030-07-01T11:30',
+        'timezone': 'Europe/Berlin'
+    })
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    event = db.session.get(Event, own_event.event_id)
+    assert event.title == 'Planning'
+    assert event.timezone == 'Europe/Berlin'
+    # Berlin is UTC+2 in summer
+    assert (event.start_time, event.end_time) == (datetime(2030, 7, 1, 8), datetime(2030, 7, 1, 9, 30))
+
+
+def test_update_keeps_omitted_fields(client, own_event):
+    response = client.put(f'/api/events/{own_event.event_id}', json={'description': 'Daily'})
+    assert response.status_code == 200
+    event = db.session.get(Event, own_event.event_id)
+    assert (event.title, event.start_time, event.description) == ('Standup', datetime(2030, 1, 7, 9), 'Daily')
+
+
+@pytest.mark.parametrize('payload', [
+    {'timezone': 'Mars/Olympus'},
+    {'start_time': 'tomorrow'},
+    {'start_time': '2030-01-07T11:00'},
+    {'title': ''},
+])
+def test_update_rejects_bad_input(client, own_event, payload):
+    assert client.put(f'/api/events/{own_event.event_id}', json=payload).status_code == 400
+
+
+def test_update_of_someone_elses_event_is_forbidden(client, own_event):
+    other = Event(title='Theirs', start_time=datetime(2030, 1, 7, 9), end_time=datetime(2030, 1, 7, 10))
+    db.session.add(other)
+    db.session.commit()
+    assert client.put(f'/api/events/{other.event_id}', json={'title': 'Mine'}).status_code == 403
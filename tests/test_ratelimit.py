@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from flask import Flask
+
+from utils.ratelimit import (
+    MemoryBucketStore,
+    RateLimiter,
+    SQLiteBucketStore,
+    check_rate_limit,
+    parse_limit,
+    parse_limits,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_parse_limit():
+    assert parse_limit('30/minute') == (0.5, 30)
+    assert parse_limit('5/second') == (5.0, 5)
+    assert parse_limits('a=1/second, b=60/hour') == {'a': (1.0, 1), 'b': (60 / 3600, 60)}
+
+
+def test_burst_then_refill(clock):
+    store = MemoryBucketStore(clock=clock)
+    rate, burst = parse_limit('3/minute')  # one token every 20s
+
+    assert [store.take('k', rate, burst)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = store.take('k', rate, burst)
+    assert not allowed
+    assert retry_after == pytest.approx(20)
+
+    clock.now += 10
+    allowed, retry_after = store.take('k', rate, burst)
+    assert not allowed
+    assert retry_after == pytest.approx(10)
+
+    clock.now += 10
+    assert store.take('k', rate, burst)[0]
+    # Idle time never refills beyond the burst size
+    clock.now += 3600
+    assert [store.take('k', rate, burst)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_least_recently_used_bucket_is_evicted(clock):
+    store = MemoryBucketStore(max_keys=2, clock=clock)
+    for key in ('a', 'b', 'a', 'c'):
+        store.take(key, 1, 1)
+    assert list(store._buckets) == ['a', 'c']
+
+
+def test_endpoint_limits_and_default_bucket(clock):
+    limiter = RateLimiter(
+        store=MemoryBucketStore(clock=clock), default='2/minute', limits={'book': parse_limit('1/minute')}
+    )
+    # 'book' has its own bucket per client...
+    assert limiter.hit('ip:1', 'book') is None
+    assert limiter.hit('ip:1', 'book') == pytest.approx(60)
+    # ...while every other endpoint shares the client's default bucket
+    assert limiter.hit('ip:1', 'events') is None
+    assert limiter.hit('ip:1', 'report') is None
+    assert limiter.hit('ip:1', 'events') == pytest.approx(30)
+    # Other clients are unaffected
+    assert limiter.hit('ip:2', 'book') is None
+
+
+def test_no_default_limits_only_listed_endpoints(clock):
+    limiter = RateLimiter(store=MemoryBucketStore(clock=clock), default=None, limits={'book': parse_limit('1/hour')})
+    assert all(limiter.hit('ip:1', 'events') is None for _ in range(100))
+
+
+def test_retry_after_is_rounded_up_to_whole_seconds(clock):
+    app = Flask(__name__)
+    app.add_url_rule('/book', 'book', lambda: '')
+    app.extensions['rate_limiter'] = RateLimiter(
+        store=MemoryBucketStore(clock=clock), default=None, limits={'book': parse_limit('1/minute')}
+    )
+    with app.test_request_context('/book'):
+        assert check_rate_limit('ip:1') is None
+        assert check_rate_limit('ip:1') == 60
+        clock.now += 0.25
+        assert check_rate_limit('ip:1') == 60
+        clock.now += 59.25
+        # 0.5s to go still means "retry after 1", never 0
+        assert check_rate_limit('ip:1') == 1
+
+
+def test_check_rate_limit_is_a_no_op_without_a_limiter():
+    app = Flask(__name__)
+    with app.test_request_context('/'):
+        assert check_rate_limit('ip:1') is None
+
+
+def test_sqlite_store_shares_buckets_and_prunes_full_ones(tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    assert first.take('k', 1 / 60, 1)[0]
+    # A second store on the same file (another worker process) sees the spent token
+    assert not second.take('k', 1 / 60, 1)[0]
+
+    # Refills within a millisecond, after which it is the same as no bucket
+    first.take('idle', 1000, 1)
+    time.sleep(0.01)
+    assert first.prune() == 1
+    assert first._connect().execute('SELECT key FROM rate_buckets').fetchall() == [('k',)]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from models import db, Event, EventResourceAllocation, Resource
+from utils.schema import upgrade_database
+
+# The tables as the first release created them (see instance/events.db)
+ORIGINAL_SCHEMA = [
+    '''CREATE TABLE users (
+        user_id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, password_hash VARCHAR(200) NOT NULL,
+        PRIMARY KEY (user_id), UNIQUE (username))''',
+    '''CREATE TABLE events (
+        event_id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, start_time DATETIME NOT NULL,
+        end_time DATETIME NOT NULL, description TEXT, user_id INTEGER REFERENCES users(user_id),
+        PRIMARY KEY (event_id))''',
+    '''CREATE TABLE resources (
+        resource_id INTEGER NOT NULL, resource_name VARCHAR(100) NOT NULL, resource_type VARCHAR(50) NOT NULL,
+        PRIMARY KEY (resource_id))''',
+    '''CREATE TABLE event_resource_allocations (
+        allocation_id INTEGER NOT NULL, event_id INTEGER NOT NULL, resource_id INTEGER NOT NULL,
+        PRIMARY KEY (allocation_id))''',
+]
+
+
+def create_original_tables():
+    db.drop_all()
+    with db.engine.begin() as conn:
+        for statement in ORIGINAL_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("INSERT INTO resources VALUES (1, 'Hall', 'Venue')")
+        conn.exec_driver_sql(
+            "INSERT INTO events (event_id, title, start_time, end_time) "
+            "VALUES (1, 'Meeting', '2030-01-07 10:00:00.000000', '2030-01-07 11:00:00.000000')"
+        )
+        conn.exec_driver_sql('INSERT INTO event_resource_allocations VALUES (1, 1, 1)')
+
+
+def test_upgrade_adds_missing_columns_and_keeps_rows(app):
+    create_original_tables()
+
+    changes = upgrade_database(db.engine)
+    assert changes['events'] == ['timezone', 'updated_at']
+    assert 'capacity' in changes['resources']
+
+    inspector = inspect(db.engine)
+    assert 'jobs' in inspector.get_table_names()
+    assert 'ix_events_time_range' in {i['name'] for i in inspector.get_indexes('events')}
+
+    event = db.session.get(Event, 1)
+    assert event.title == 'Meeting'
+    assert event.updated_at is not None
+    resource = db.session.get(Resource, 1)
+    assert (resource.capacity, resource.buffer_before_minutes) == (1, 0)
+    assert EventResourceAllocation.query.count() == 1
+
+
+def test_upgrade_is_idempotent(app):
+    create_original_tables()
+    upgrade_database(db.engine)
+    assert upgrade_database(db.engine) == {}
+    # A database created from the current models needs nothing either
+    db.drop_all()
+    db.create_all()
+    assert upgrade_database(db.engine) == {}
+
+
+def test_upgrade_converts_old_wall_clock_times_to_utc(app, monkeypatch):
+    import config
+    monkeypatch.setattr(config.Config, 'DEFAULT_TIMEZONE', 'Europe/Berlin')
+    create_original_tables()
+
+    upgrade_database(db.engine)
+    event = db.session.get(Event, 1)
+    # 10:00 in Berlin in winter is 09:00 UTC
+    assert (event.start_time, event.end_time) == (datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10))
+    assert event.timezone == 'Europe/Berlin'
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from models import db, Event, Resource, EventResourceAllocation, Tombstone
+from utils.archive import archive_past_events
+from utils.sync import changes_since, decode_token, encode_token
+
+TOMBSTONE_DAYS = 30
+
+
+def backdate():
+    """Pretend every row was last changed an hour ago, before any token a test takes."""
+    past = datetime.utcnow() - timedelta(hours=1)
+    for model in (Event, Resource, EventResourceAllocation):
+        model.query.update({'updated_at': past}, synchronize_session=False)
+    db.session.commit()
+
+
+def make_rows():
+    resource = Resource(resource_name='Room', resource_type='Venue')
+    events = [
+        Event(title=f'Event {i}', start_time=datetime(2030, 1, 7, 9 + i), end_time=datetime(2030, 1, 7, 10 + i))
+        for i in range(3)
+    ]
+    db.session.add_all([resource, *events])
+    db.session.commit()
+    allocation = EventResourceAllocation(event_id=events[0].event_id, resource_id=resource.resource_id)
+    db.session.add(allocation)
+    db.session.commit()
+    backdate()
+    return resource, events, allocation
+
+
+def test_token_round_trip_returns_only_changed_rows(app):
+    resource, events, allocation = make_rows()
+
+    snapshot = changes_since(None, TOMBSTONE_DAYS)
+    assert snapshot['reset'] is True
+    assert len(snapshot['events']) == 3
+
+    events[1].title = 'Renamed'
+    db.session.commit()
+
+    delta = changes_since(decode_token(snapshot['token']), TOMBSTONE_DAYS)
+    assert delta['reset'] is False
+    assert [row['title'] for row in delta['events']] == ['Renamed']
+    assert delta['resources'] == [] and delta['allocations'] == []
+    assert delta['deleted'] == {'events': [], 'resources': [], 'allocations': []}
+
+
+def test_session_deletes_leave_tombstones(app):
+    resource, events, allocation = make_rows()
+    since = datetime.utcnow() - timedelta(minutes=1)
+
+    # Deleting the event removes its allocation through the cascade
+    db.session.delete(events[0])
+    db.session.commit()
+
+    delta = changes_since(since, TOMBSTONE_DAYS)
+    assert delta['deleted']['events'] == [events[0].event_id]
+    assert delta['deleted']['allocations'] == [allocation.allocation_id]
+
+
+def test_archiving_leaves_tombstones(app):
+    resource, events, allocation = make_rows()
+    Event.query.filter_by(event_id=events[0].event_id).update({
+        'start_time': datetime(2000, 1, 1, 9), 'end_time': datetime(2000, 1, 1, 10)
+    }, synchronize_session=False)
+    db.session.commit()
+    backdate()
+    event_id, allocation_id = events[0].event_id, allocation.allocation_id
+    since = datetime.utcnow() - timedelta(minutes=1)
+
+    assert archive_past_events(horizon_days=90) == 1
+
+    delta = changes_since(since, TOMBSTONE_DAYS)
+    assert delta['deleted']['events'] == [event_id]
+    assert delta['deleted']['allocations'] == [allocation_id]
+    assert delta['events'] == []
+
+
+def test_tokens_older_than_the_tombstone_window_get_a_reset(app):
+    make_rows()
+    db.session.add(Tombstone(table_name='events', row_id=99))
+    db.session.commit()
+
+    stale = datetime.utcnow() - timedelta(days=TOMBSTONE_DAYS + 1)
+    changes = changes_since(stale, TOMBSTONE_DAYS)
+    assert changes['reset'] is True
+    assert len(changes['events']) == 3
+    assert changes['deleted'] == {}
+
+
+def test_sync_endpoint(client):
+    make_rows()
+    first = client.get('/sync').get_json()
+    assert first['reset'] is True
+
+    stale = encode_token(datetime.utcnow() - timedelta(days=TOMBSTONE_DAYS + 1))
+    assert client.get(f'/sync?since={stale}').get_json()['reset'] is True
+    assert client.get(f"/sync?since={first['token']}").get_json()['reset'] is False
+    assert client.get('/sync?since=yesterday').status_code == 400
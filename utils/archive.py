@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from models import db, Event, EventResourceAllocation, ArchivedEvent, ArchivedAllocation, Tombstone
+
+
+def archive_past_events(horizon_days, batch_size=500):
+    """
+    Move events that ended more than ``horizon_days`` ago, together with their
+    allocations, into the archive tables. Work is done in batches so a large
+    backlog never holds the SQLite write lock for long. Returns the number of
+    events archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=horizon_days)
+    archived = 0
+
+    while True:
+        event_ids = [
+            event_id for (event_id,) in
+            db.session.query(Event.event_id)
+            .filter(Event.end_time < cutoff)
+            .order_by(Event.event_id)
+            .limit(batch_size)
+        ]
+        if not event_ids:
+            break
+
+        now = datetime.utcnow()
+        try:
+            db.session.execute(
+                db.insert(ArchivedEvent).from_select(
+                    ['event_id', 'user_id', 'title', 'start_time', 'end_time', 'timezone', 'description', 'archived_at'],
+                    db.select(
+                        Event.event_id, Event.user_id, Event.title, Event.start_time,
+                        Event.end_time, Event.timezone, Event.description, db.literal(now)
+                    ).where(Event.event_id.in_(event_ids))
+                )
+            )
+            db.session.execute(
+                db.insert(ArchivedAllocation).from_select(
+                    ['allocation_id', 'event_id', 'resource_id'],
+                    db.select(
+                        EventResourceAllocation.allocation_id,
+                        EventResourceAllocation.event_id,
+                        EventResourceAllocation.resource_id
+                    ).where(EventResourceAllocation.event_id.in_(event_ids))
+                )
+            )
+            # Bulk deletes skip the session hook, so tell delta sync clients here
+            db.session.execute(
+                db.insert(Tombstone).from_select(
+                    ['table_name', 'row_id', 'deleted_at'],
+                    db.select(db.literal('allocations'), EventResourceAllocation.allocation_id, db.literal(now))
+                    .where(EventResourceAllocation.event_id.in_(event_ids))
+                )
+            )
+            db.session.execute(
+                db.insert(Tombstone).from_select(
+                    ['table_name', 'row_id', 'deleted_at'],
+                    db.select(db.literal('events'), Event.event_id, db.literal(now))
+                    .where(Event.event_id.in_(event_ids))
+                )
+            )
+            EventResourceAllocation.query.filter(
+                EventResourceAllocation.event_id.in_(event_ids)
+            ).delete(synchronize_session=False)
+            Event.query.filter(Event.event_id.in_(event_ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(event_ids)
+
+    return archived
+
+
+def latest_archived_time():
+    """End time of the most recent archived event, or None if the archive is empty."""
+    return db.session.query(db.func.max(ArchivedEvent.end_time)).scalar()
+
@@ -0,0 +1,147 @@
+import json
+import threading
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Event, EventResourceAllocation
+from utils.timezones import utc_isoformat
+
+
+class Subscriber:
+    """One listener's bounded buffer. When it overflows, the oldest messages are dropped."""
+
+    def __init__(self, buffer_size):
+        self.messages = deque(maxlen=buffer_size)
+        self.overflowed = False
+        self.condition = threading.Condition()
+
+    def push(self, message):
+        with self.condition:
+            if len(self.messages) == self.messages.maxlen:
+                self.overflowed = True
+            self.messages.append(message)
+            self.condition.notify()
+
+    def wait(self, timeout=None):
+        """
+        Block until messages are available (or ``timeout`` seconds pass) and
+        return them. A subscriber that fell behind gets a single ``reset``
+        message telling it to reload instead of a partial history.
+        """
+        with self.condition:
+            if not self.messages:
+                self.condition.wait(timeout)
+            if self.overflowed:
+                last_id = self.messages[-1]['id'] if self.messages else None
+                self.messages.clear()
+                self.overflowed = False
+                return [{'id': last_id, 'type': 'reset', 'data': {}}]
+            messages = list(self.messages)
+            self.messages.clear()
+            return messages
+
+
+class ChangeFeed:
+    """In-process publish/subscribe hub for event and allocation changes."""
+
+    def __init__(self, buffer_size=256):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=buffer_size)
+        self._last_id = 0
+
+    def subscribe(self, last_event_id=None):
+        subscriber = Subscriber(self.buffer_size)
+        with self._lock:
+            if last_event_id is not None:
+                # Replay what the client missed while reconnecting, if we still have it
+                oldest = self._history[0]['id'] if self._history else self._last_id + 1
+                # An id from the future was issued before a restart (ids start over at 0)
+                if last_event_id < oldest - 1 or last_event_id > self._last_id:
+                    subscriber.push({'id': self._last_id, 'type': 'reset', 'data': {}})
+                else:
+                    for message in self._history:
+                        if message['id'] > last_event_id:
+                            subscriber.push(message)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, kind, data):
+        with self._lock:
+            self._last_id += 1
+            message = {'id': self._last_id, 'type': kind, 'data': data}
+            self._history.append(message)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+
+def format_sse(message):
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+# =====================================================
+# SQLALCHEMY SESSION HOOKS
+# =====================================================
+def _serialize(obj, action):
+    if isinstance(obj, Event):
+        data = {'event_id': obj.event_id}
+        if action != 'deleted':
+            data.update({
+                'user_id': obj.user_id,
+                'title': obj.title,
+                'start_time': utc_isoformat(obj.start_time),
+                'end_time': utc_isoformat(obj.end_time),
+                'timezone': obj.timezone,
+                'description': obj.description,
+            })
+        return f'event.{action}', data
+
+    if isinstance(obj, EventResourceAllocation):
+        return f'allocation.{action}', {
+            'allocation_id': obj.allocation_id,
+            'event_id': obj.event_id,
+            'resource_id': obj.resource_id,
+        }
+
+    return None
+
+
+def init_change_feed(app, feed=None):
+    """
+    Publish create/update/delete of events and allocations to ``feed`` once
+    the surrounding transaction commits. Changes made through bulk
+    ``Query.delete()``/``update()`` bypass the session and are not published.
+    """
+    feed = feed or ChangeFeed(app.config.get('CHANGE_FEED_BUFFER', 256))
+
+    def collect(session, flush_context):
+        pending = session.info.setdefault('pending_changes', [])
+        for action, objects in (('created', session.new), ('updated', session.dirty), ('deleted', session.deleted)):
+            for obj in objects:
+                if action == 'updated' and not session.is_modified(obj):
+                    continue
+                change = _serialize(obj, action)
+                if change:
+                    pending.append(change)
+
+    def publish(session):
+        for kind, data in session.info.pop('pending_changes', []):
+            feed.publish(kind, data)
+
+    def discard(session):
+        session.info.pop('pending_changes', None)
+
+    event.listen(Session, 'after_flush', collect)
+    event.listen(Session, 'after_commit', publish)
+    event.listen(Session, 'after_rollback', discard)
+
+    app.extensions['change_feed'] = feed
+    return feed
@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'text/calendar',
+    'application/json',
+    'application/javascript',
+    'image/svg+xml',
+}
+
+
+class CompressedBodyCache:
+    """Bounded LRU of compressed bodies keyed by (encoding, body digest)."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _compress(body, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(body, quality=level['br'])
+    return gzip.compress(body, compresslevel=level['gzip'], mtime=0)
+
+
+def init_compression(app, cache=None):
+    """
+    Compress responses larger than ``COMPRESSION_MIN_SIZE`` bytes with brotli
+    or gzip, whichever the client prefers. Identical GET bodies (the same
+    listing served to many clients) are compressed once and reused from an
+    in-memory cache. Streamed responses such as the SSE feed are left alone.
+    """
+    min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+    level = {
+        'gzip': app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+        'br': app.config.get('COMPRESSION_BROTLI_QUALITY', 5),
+    }
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    cache = cache or CompressedBodyCache(app.config.get('COMPRESSION_CACHE_SIZE', 128))
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if not encoding or response.content_length is None or response.content_length < min_size:
+            return response
+
+        body = response.get_data()
+        compressed = None
+        cacheable = request.method == 'GET' and response.status_code == 200
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = cache.get(key)
+
+        if compressed is None:
+            compressed = _compress(body, encoding, level)
+            if cacheable:
+                cache.put(key, compressed)
+
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag of the identity body must not be reused for the compressed one
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    app.extensions['compression_cache'] = cache
+    return cache
@@ -1,18 +1,297 @@
-from models import Event, EventResourceAllocation
+import heapq
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Event, Resource, EventResourceAllocation
+
+# Serializes bookings made by threads of this process; lock_for_booking
+# covers other processes sharing the database
+booking_lock = threading.Lock()
+
+
+def padded(resource, start_time, end_time):
+    """The span a booking actually occupies once setup/cleanup buffers are added."""
+    return (
+        start_time - timedelta(minutes=resource.buffer_before_minutes or 0),
+        end_time + timedelta(minutes=resource.buffer_after_minutes or 0)
+    )
+
+
+def peak_concurrency(intervals, window_start, window_end):
+    """
+    Sweep ``intervals`` ([(start, end, item), ...]) and return the highest
+    number of them active at once inside [window_start, window_end), along
+    with the items active at that moment. Intervals that merely touch do not
+    overlap.
+    """
+    points = []
+    for start, end, item in intervals:
+        if start < window_end and end > window_start:
+            points.append((max(start, window_start), 1, item))
+            points.append((min(end, window_end), -1, item))
+    # Ends sort before starts at the same instant
+    points.sort(key=lambda p: (p[0], p[1]))
+
+    active = []
+    peak, peak_items = 0, []
+    for _, delta, item in points:
+        if delta == 1:
+            active.append(item)
+            if len(active) > peak:
+                peak, peak_items = len(active), list(active)
+        else:
+            active.remove(item)
+    return peak, peak_items
+
+
+def fetch_bookings(resources, start_time, end_time, exclude_event_id=None):
+    """
+    Bookings of ``resources`` whose padded span overlaps the padded
+    [start_time, end_time), in one query over the event time index.
+    Returns {resource_id: [(padded_start, padded_end, Event), ...]} sorted by start.
+    """
+    if not resources:
+        return {}
+
+    by_id = {r.resource_id: r for r in resources}
+    # Widest combined buffer, so the SQL filter is a superset for every resource
+    slack = timedelta(minutes=max(
+        (r.buffer_before_minutes or 0) + (r.buffer_after_minutes or 0) for r in resources
+    ))
+
+    query = (
+        db.session.query(EventResourceAllocation.resource_id, Event)
+        .join(Event)
+        .filter(
+            EventResourceAllocation.resource_id.in_(list(by_id)),
+            Event.start_time < end_time + slack,
+            Event.end_time > start_time - slack
+        )
+    )
+    if exclude_event_id is not None:
+        query = query.filter(Event.event_id != exclude_event_id)
+
+    bookings = defaultdict(list)
+    for resource_id, event in query.order_by(Event.start_time):
+        bookings[resource_id].append((*padded(by_id[resource_id], event.start_time, event.end_time), event))
+    return bookings
+
+
+def find_conflicts(resource_ids, start_time, end_time, exclude_event_id=None):
+    """
+    Resources among ``resource_ids`` that cannot take another booking for
+    [start_time, end_time) because their capacity is already reached at
+    some point, buffers included. Returns {resource_id: [Event, ...]} with
+    the events holding the resource at its busiest moment.
+    """
+    if not resource_ids:
+        return {}
+
+    resources = Resource.query.filter(Resource.resource_id.in_(list(resource_ids))).all()
+    bookings = fetch_bookings(resources, start_time, end_time, exclude_event_id)
+
+    conflicts = {}
+    for resource in resources:
+        window_start, window_end = padded(resource, start_time, end_time)
+        peak, holders = peak_concurrency(bookings.get(resource.resource_id, []), window_start, window_end)
+        if peak >= (resource.capacity or 1):
+            conflicts[resource.resource_id] = holders
+    return conflicts
+
 
 def has_resource_conflict(resource_id, start_time, end_time):
-    allocations = EventResourceAllocation.query.all()
+    conflicts = find_conflicts([resource_id], start_time, end_time)
+    return conflicts[resource_id][0] if conflicts else None
 
-    for allocation in allocations:
-        if allocation.resource_id != resource_id:
-            continue
 
-        event = Event.query.get(allocation.event_id)
-        if not event:
-            continue
+def resolve_resources_by_type(type_counts, start_time, end_time, exclude_ids=()):
+    """
+    Pick ``count`` free resources of each requested type, e.g.
+    {'Projector': 1, 'Staff': 2}, never choosing one in ``exclude_ids``.
+    Returns (resource_ids, shortfall) where shortfall maps each type that
+    can't be satisfied to how many are missing.
+    """
+    query = Resource.query.filter(Resource.resource_type.in_(list(type_counts)))
+    if exclude_ids:
+        query = query.filter(Resource.resource_id.notin_(list(exclude_ids)))
+    candidates = query.order_by(Resource.resource_id).all()
+    busy = find_conflicts([r.resource_id for r in candidates], start_time, end_time)
+
+    chosen = []
+    shortfall = {}
+    for resource_type, count in type_counts.items():
+        free = [
+            r.resource_id for r in candidates
+            if r.resource_type == resource_type and r.resource_id not in busy
+        ]
+        chosen.extend(free[:count])
+        if len(free) < count:
+            shortfall[resource_type] = count - len(free)
+    return chosen, shortfall
 
-        # Overlap check
-        if start_time < event.end_time and end_time > event.start_time:
-            return event
 
+def earliest_bundle_window(resource_ids, duration, not_before, horizon=timedelta(days=30), exclude_event_id=None):
+    """
+    Earliest start at or after ``not_before`` where every resource in the
+    bundle has spare capacity for ``duration``, searching up to ``horizon``
+    ahead. Bookings are fetched once; the only candidate starts are
+    ``not_before`` and the moments a booking releases a resource.
+    Returns (start, end) or None.
+    """
+    limit = not_before + horizon
+    resources = Resource.query.filter(Resource.resource_id.in_(list(resource_ids))).all()
+    bookings = fetch_bookings(resources, not_before, limit + duration, exclude_event_id)
+
+    candidates = {not_before}
+    for resource in resources:
+        lead = timedelta(minutes=resource.buffer_before_minutes or 0)
+        for _, padded_end, _ in bookings.get(resource.resource_id, []):
+            if not_before < padded_end + lead <= limit:
+                candidates.add(padded_end + lead)
+
+    for candidate in sorted(candidates):
+        if all(
+            peak_concurrency(
+                bookings.get(resource.resource_id, []),
+                *padded(resource, candidate, candidate + duration)
+            )[0] < (resource.capacity or 1)
+            for resource in resources
+        ):
+            return candidate, candidate + duration
     return None
+
+
+def nearest_free_windows(resource, start_time, end_time, count=3, horizon=timedelta(days=7),
+                         not_before=None, exclude_event_id=None):
+    """
+    Up to ``count`` start/end pairs of the same duration, nearest to the
+    requested start, where ``resource`` has spare capacity. Bookings within
+    ``horizon`` either side are fetched once; the nearest free slot always
+    starts right after a booking releases the resource or ends right before
+    one begins, so the search starts from those points and walks outwards.
+    """
+    duration = end_time - start_time
+    lead = timedelta(minutes=resource.buffer_before_minutes or 0)
+    trail = timedelta(minutes=resource.buffer_after_minutes or 0)
+    earliest = max(start_time - horizon, not_before or start_time - horizon)
+    latest = start_time + horizon
+
+    bookings = fetch_bookings([resource], earliest, latest + duration, exclude_event_id).get(resource.resource_id, [])
+
+    candidates = set()
+    for padded_start, padded_end, _ in bookings:
+        candidates.add(padded_end + lead)
+        candidates.add(padded_start - trail - duration)
+    heap = [(abs(c - start_time), c) for c in candidates if c != start_time]
+    heapq.heapify(heap)
+
+    windows = []
+    seen = set()
+    while heap and len(windows) < count:
+        _, candidate = heapq.heappop(heap)
+        if candidate in seen or not earliest <= candidate <= latest:
+            continue
+        seen.add(candidate)
+
+        peak, _ = peak_concurrency(bookings, *padded(resource, candidate, candidate + duration))
+        if peak < (resource.capacity or 1):
+            windows.append((candidate, candidate + duration))
+            # The slot right next to a free one (away from the request) may be free too
+            step = duration if candidate > start_time else -duration
+            heapq.heappush(heap, (abs(candidate + step - start_time), candidate + step))
+    return sorted(windows)
+
+
+def free_resources_of_type(resource, start_time, end_time):
+    """Other resources of the same type with spare capacity for the window."""
+    siblings = (
+        Resource.query
+        .filter(Resource.resource_type == resource.resource_type, Resource.resource_id != resource.resource_id)
+        .order_by(Resource.resource_id)
+        .all()
+    )
+    busy = find_conflicts([r.resource_id for r in siblings], start_time, end_time)
+    return [r for r in siblings if r.resource_id not in busy]
+
+
+def lock_for_booking(resource_ids):
+    """
+    Start the write transaction a booking is re-checked and committed in,
+    so another process can't book the same resources in between. SQLite
+    takes its database write lock up front (``BEGIN IMMEDIATE``); other
+    databases lock the resource rows, in id order to avoid deadlocks.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        # pysqlite only opens a transaction before a write, so if one is open
+        # this connection already holds the write lock
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+    else:
+        (
+            Resource.query
+            .filter(Resource.resource_id.in_(resource_ids))
+            .order_by(Resource.resource_id)
+            .with_for_update()
+            .all()
+        )
+
+
+def booking_conflicts(event, resource_ids):
+    conflicts = find_conflicts(resource_ids, event.start_time, event.end_time)
+    # A shared resource may have spare capacity, but an event holds it only once
+    already_held = (
+        db.session.query(EventResourceAllocation.resource_id)
+        .filter(
+            EventResourceAllocation.event_id == event.event_id,
+            EventResourceAllocation.resource_id.in_(resource_ids)
+        )
+    )
+    for (resource_id,) in already_held:
+        conflicts.setdefault(resource_id, [event])
+    return conflicts
+
+
+def book_resources(event, resource_ids):
+    """
+    Allocate every resource in ``resource_ids`` to ``event`` or none of them.
+    Returns (allocations, conflicts); on conflict nothing is written and
+    ``conflicts`` maps resource ids to the events already holding them.
+
+    The first check runs without locks. If it passes, the check is repeated
+    inside a write transaction (see ``lock_for_booking``) after the new rows
+    are flushed, and the booking is rolled back if another request got there
+    first.
+    """
+    resource_ids = sorted(set(resource_ids))
+
+    with booking_lock:
+        conflicts = booking_conflicts(event, resource_ids)
+        if conflicts:
+            return [], conflicts
+
+        allocations = [
+            EventResourceAllocation(event_id=event.event_id, resource_id=resource_id)
+            for resource_id in resource_ids
+        ]
+        try:
+            lock_for_booking(resource_ids)
+            db.session.add_all(allocations)
+            db.session.flush()
+            conflicts = find_conflicts(resource_ids, event.start_time, event.end_time, exclude_event_id=event.event_id)
+            if conflicts:
+                db.session.rollback()
+                return [], conflicts
+            db.session.commit()
+        except IntegrityError:
+            # Another request booked the same resource for this event
+            db.session.rollback()
+            return [], booking_conflicts(event, resource_ids)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return allocations, {}
@@ -3,6 +3,14 @@ from functools import wraps
 from flask import request, jsonify, g
 from config import Config
 from models import User
+from utils.ratelimit import check_rate_limit
+
+
+def rate_limited_response(retry_after):
+    response = jsonify({'message': 'Rate limit exceeded, try again later.'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
 
 
 # =====================================================
@@ -31,6 +39,25 @@ def token_required(f):
         except Exception as e:
             return jsonify({'message': str(e)}), 401
 
+        retry_after = check_rate_limit(f'user:{user.username}')
+        if retry_after is not None:
+            return rate_limited_response(retry_after)
+
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+# =====================================================
+# RATE LIMIT FOR ANONYMOUS ENDPOINTS
+# =====================================================
+def rate_limited(f):
+    """Rate limit a public endpoint by client address."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        retry_after = check_rate_limit(f'ip:{request.remote_addr}')
+        if retry_after is not None:
+            return rate_limited_response(retry_after)
         return f(*args, **kwargs)
 
     return decorated
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import func, select
+
+from models import db, Event, EventResourceAllocation
+
+CRLF = '\r\n'
+STAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+# =====================================================
+# ICALENDAR TEXT
+# =====================================================
+def _escape(text):
+    return (
+        (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces joined by CRLF + space (RFC 5545 3.1)."""
+    if len(line.encode()) <= 75:
+        return line + CRLF
+    pieces, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            pieces.append(current)
+            # Continuation lines start with a space, which counts towards the limit
+            current, size = ' ', 1
+        current += char
+        size += width
+    pieces.append(current)
+    return CRLF.join(pieces) + CRLF
+
+
+def _vevent(event_id, title, start_time, end_time, description, updated_at):
+    # Stored times are UTC, so they are written in UTC form and need no VTIMEZONE
+    return ''.join(_fold(line) for line in (
+        'BEGIN:VEVENT',
+        f'UID:event-{event_id}@event-scheduler',
+        f'DTSTAMP:{updated_at:{STAMP_FORMAT}}',
+        f'LAST-MODIFIED:{updated_at:{STAMP_FORMAT}}',
+        f'DTSTART:{start_time:{STAMP_FORMAT}}',
+        f'DTEND:{end_time:{STAMP_FORMAT}}',
+        f'SUMMARY:{_escape(title)}',
+        *([f'DESCRIPTION:{_escape(description)}'] if description else []),
+        'END:VEVENT',
+    ))
+
+
+def generate_calendar(name, query, batch_size=500):
+    """
+    Yield an iCalendar document for the events selected by ``query`` in
+    chunks of ``batch_size`` events, so a large feed is never held in
+    memory as ORM objects.
+    """
+    yield ''.join(_fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Event Scheduler//Calendar Feed//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    )).encode()
+
+    rows = db.session.execute(query.execution_options(yield_per=batch_size))
+    for batch in rows.partitions():
+        yield ''.join(_vevent(*row) for row in batch).encode()
+
+    yield ('END:VCALENDAR' + CRLF).encode()
+
+
+def _columns():
+    return select(Event.event_id, Event.title, Event.start_time, Event.end_time, Event.description, Event.updated_at)
+
+
+def user_feed_query(user_id):
+    return _columns().where(Event.user_id == user_id).order_by(Event.start_time)
+
+
+def resource_feed_query(resource_id):
+    return (
+        _columns()
+        .join(EventResourceAllocation, EventResourceAllocation.event_id == Event.event_id)
+        .where(EventResourceAllocation.resource_id == resource_id)
+        .order_by(Event.start_time)
+    )
+
+
+# =====================================================
+# FEED CACHE
+# =====================================================
+def user_feed_state(user_id):
+    return select(func.count(Event.event_id), func.max(Event.updated_at)).where(Event.user_id == user_id)
+
+
+def resource_feed_state(resource_id):
+    return (
+        select(func.count(EventResourceAllocation.allocation_id),
+               func.max(EventResourceAllocation.updated_at), func.max(Event.updated_at))
+        .join(Event, Event.event_id == EventResourceAllocation.event_id)
+        .where(EventResourceAllocation.resource_id == resource_id)
+    )
+
+
+def feed_etag(name, state_query):
+    """
+    ETag of a feed from the database state it is rendered from: the row
+    count catches deletions (including archiving), the newest ``updated_at``
+    catches inserts and edits, and the name covers renames. Every worker
+    process and CLI run sees the same state, so they agree on the ETag.
+    """
+    state = db.session.execute(state_query).one()
+    return hashlib.sha1(repr((name, *state)).encode()).hexdigest()[:20]
+
+
+class FeedCache:
+    """
+    Rendered feeds keyed by ('user', id) or ('resource', id), each stored
+    with the ETag it was rendered at. A body is only served while its ETag
+    is still the current one, so stale entries are never returned and are
+    simply replaced or aged out (least recently used first).
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, etag):
+        """The cached body for ``key`` if it was rendered at ``etag``."""
+        with self._lock:
+            entry = self._bodies.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._bodies.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._bodies[key] = (etag, body)
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+
+def init_ical_feeds(app, cache=None):
+    cache = cache or FeedCache(app.config.get('ICAL_CACHE_SIZE', 256))
+    app.extensions['ical_feeds'] = cache
+    return cache
@@ -0,0 +1,180 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from config import Config
+from models import db, Job
+from utils.archive import archive_past_events
+from utils.reports import utilization_report
+from utils.sync import purge_tombstones
+
+# kind -> function(params, progress) returning a JSON-serializable result
+JOB_TYPES = {}
+
+
+def job_type(kind):
+    def register(fn):
+        JOB_TYPES[kind] = fn
+        return fn
+    return register
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+@job_type('utilization_report')
+def run_utilization_report(params, progress):
+    return utilization_report(
+        date.fromisoformat(params['start_date']),
+        date.fromisoformat(params['end_date']),
+        progress=progress,
+        workers=Config.REPORT_WORKERS
+    )
+
+
+@job_type('archive_events')
+def run_archive_events(params, progress):
+    return {'archived': archive_past_events(int(params['horizon_days']))}
+
+
+@job_type('purge_tombstones')
+def run_purge_tombstones(params, progress):
+    return {'purged': purge_tombstones(int(params['days']))}
+
+
+class JobRunner:
+    """
+    Runs jobs on a small thread pool, off the request path. At most
+    ``max_workers`` jobs run at once and at most ``max_pending`` may be
+    queued or running, so background work can't crowd out interactive
+    requests for database time.
+
+    Each runner stamps its jobs with a worker id and refreshes their
+    heartbeat every ``heartbeat_seconds`` while the process is alive, so
+    other processes sharing the database can tell live jobs from orphans.
+    """
+
+    def __init__(self, app, max_workers=2, max_pending=20, heartbeat_seconds=15):
+        self.app = app
+        self.max_pending = max_pending
+        self.heartbeat_seconds = heartbeat_seconds
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._heartbeat = None
+
+    def submit(self, kind, params, user_id=None):
+        if kind not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {kind}")
+
+        self._start_heartbeat()
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull("Too many background jobs queued, try again later.")
+            self._pending += 1
+
+        try:
+            job = Job(
+                kind=kind, params=json.dumps(params), user_id=user_id,
+                worker_id=self.worker_id, heartbeat_at=datetime.utcnow()
+            )
+            db.session.add(job)
+            db.session.commit()
+            self._executor.submit(self._run, job.job_id)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                self._execute(job_id)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _execute(self, job_id):
+        job = db.session.get(Job, job_id)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        last_saved = [0.0]
+
+        def progress(fraction):
+            # Write at most every 5%, on a separate connection so the job's
+            # own session (and the objects it has loaded) is left untouched
+            if fraction - last_saved[0] >= 0.05 or fraction >= 1:
+                last_saved[0] = fraction
+                with db.engine.begin() as conn:
+                    conn.execute(
+                        db.update(Job).where(Job.job_id == job_id).values(progress=round(fraction, 3))
+                    )
+
+        try:
+            result = JOB_TYPES[job.kind](json.loads(job.params or '{}'), progress)
+            job.result = json.dumps(result, default=str)
+            job.status = 'done'
+            job.progress = 1.0
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            self.app.logger.exception("Background job %s (%s) failed", job_id, job.kind)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            try:
+                with self.app.app_context():
+                    self.beat()
+                    self.recover()
+            except Exception:
+                self.app.logger.exception("Background job heartbeat failed")
+
+    def beat(self):
+        """Mark this process's unfinished jobs as still alive."""
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.update(Job)
+                .where(Job.worker_id == self.worker_id, Job.status.in_(['queued', 'running']))
+                .values(heartbeat_at=datetime.utcnow())
+            )
+
+    def recover(self):
+        """
+        Fail queued or running jobs whose owner stopped sending heartbeats
+        (the process exited or was killed); they will never finish. Jobs of
+        live workers, in this process or another, are left alone.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.heartbeat_seconds * 4)
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.update(Job)
+                .where(
+                    Job.status.in_(['queued', 'running']),
+                    db.or_(Job.worker_id.is_(None), Job.worker_id != self.worker_id),
+                    db.or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale_before)
+                )
+                .values(status='failed', error='Worker stopped before the job finished', finished_at=now)
+            )
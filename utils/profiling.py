@@ -0,0 +1,167 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Thread-safe in-process store for per-endpoint request and SQL metrics."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._latency_sum = defaultdict(float)
+        self._requests = Counter()
+        self._sql_queries = Counter()
+        self._sql_seconds = defaultdict(float)
+        self._n_plus_one = Counter()
+
+    def observe(self, endpoint, method, status, seconds, queries, sql_seconds, n_plus_one):
+        key = (endpoint, method)
+        with self._lock:
+            self._latency[key][bisect_left(self.buckets, seconds)] += 1
+            self._latency_sum[key] += seconds
+            self._requests[(endpoint, method, status)] += 1
+            self._sql_queries[endpoint] += queries
+            self._sql_seconds[endpoint] += sql_seconds
+            if n_plus_one:
+                self._n_plus_one[endpoint] += 1
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                '# HELP http_request_duration_seconds Request latency by endpoint.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (endpoint, method), counts in sorted(self._latency.items()):
+                labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {self._latency_sum[(endpoint, method)]:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+            lines += [
+                '# HELP http_requests_total Requests served by endpoint and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",status="{status}"}} {count}'
+                )
+
+            lines += [
+                '# HELP sql_queries_total SQL statements executed while serving each endpoint.',
+                '# TYPE sql_queries_total counter',
+            ]
+            for endpoint, count in sorted(self._sql_queries.items()):
+                lines.append(f'sql_queries_total{{endpoint="{_label(endpoint)}"}} {count}')
+
+            lines += [
+                '# HELP sql_query_seconds_total Time spent in SQL while serving each endpoint.',
+                '# TYPE sql_query_seconds_total counter',
+            ]
+            for endpoint, seconds in sorted(self._sql_seconds.items()):
+                lines.append(f'sql_query_seconds_total{{endpoint="{_label(endpoint)}"}} {seconds:.6f}')
+
+            lines += [
+                '# HELP sql_n_plus_one_requests_total Requests that repeated one SQL statement past the N+1 threshold.',
+                '# TYPE sql_n_plus_one_requests_total counter',
+            ]
+            for endpoint, count in sorted(self._n_plus_one.items()):
+                lines.append(f'sql_n_plus_one_requests_total{{endpoint="{_label(endpoint)}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# =====================================================
+# SQLALCHEMY ENGINE HOOKS
+# =====================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if not has_request_context() or 'sql_profile' not in g:
+        return
+
+    profile = g.sql_profile
+    profile['count'] += 1
+    profile['seconds'] += time.perf_counter() - started
+    # Statements are compiled with placeholders, so a query issued once per
+    # row of an earlier result shows up as the same text over and over
+    profile['statements'][statement] += 1
+
+
+def init_profiling(app, metrics=None):
+    """
+    Attach request timing and SQL profiling to ``app`` and expose the
+    collected metrics on ``/metrics``. Requests that repeat a single statement
+    ``N_PLUS_ONE_THRESHOLD`` times or more are logged as likely N+1 patterns.
+    """
+    metrics = metrics or RequestMetrics()
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        g.request_start_time = time.perf_counter()
+        g.sql_profile = {'count': 0, 'seconds': 0.0, 'statements': Counter()}
+
+    @app.after_request
+    def finish_profile(response):
+        if 'sql_profile' not in g:
+            return response
+
+        elapsed = time.perf_counter() - g.request_start_time
+        profile = g.sql_profile
+        endpoint = request.endpoint or 'unmatched'
+
+        repeated = [
+            (statement, count) for statement, count in profile['statements'].items()
+            if count >= threshold
+        ]
+        for statement, count in repeated:
+            app.logger.warning(
+                "Possible N+1 query in %s: statement executed %d times: %s",
+                endpoint, count, ' '.join(statement.split())[:200]
+            )
+
+        metrics.observe(
+            endpoint, request.method, response.status_code,
+            elapsed, profile['count'], profile['seconds'], bool(repeated)
+        )
+
+        if app.debug or app.config.get('PROFILING_DEBUG_HEADERS'):
+            response.headers['X-Query-Count'] = str(profile['count'])
+            response.headers['X-SQL-Time-Ms'] = f"{profile['seconds'] * 1000:.2f}"
+            response.headers['X-Response-Time-Ms'] = f"{elapsed * 1000:.2f}"
+
+        return response
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    app.extensions['request_metrics'] = metrics
+    return metrics
@@ -0,0 +1,175 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(spec):
+    """
+    ``'20/minute'`` -> (tokens per second, burst). A client may spend the
+    whole allowance at once and then gets it back at a steady rate.
+    """
+    count, _, period = spec.strip().partition('/')
+    count = int(count)
+    return count / PERIODS[period.strip() or 'minute'], count
+
+
+def parse_limits(spec):
+    """``'events.register_for_event=20/minute,allocate_resource=30/minute'`` -> {endpoint: limit}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        endpoint, _, limit = item.partition('=')
+        limits[endpoint.strip()] = parse_limit(limit)
+    return limits
+
+
+class MemoryBucketStore:
+    """
+    Token buckets for this process only, kept in least-recently-used order.
+    Past ``max_keys`` the least recently seen client's bucket is evicted, so
+    every take is O(1) however many clients are hitting the app.
+    """
+
+    # take() never waits on I/O, so async callers may call it directly
+    blocking = False
+
+    def __init__(self, max_keys=10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Spend one token; returns (allowed, seconds until one is available)."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                # Idle longest; at worst that client starts again with a full bucket
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a local SQLite file, shared by every worker process on
+    the host. Each take is one short ``BEGIN IMMEDIATE`` transaction. Full
+    (idle) buckets are deleted every ``prune_interval`` seconds.
+    """
+
+    blocking = True
+
+    def __init__(self, path, prune_interval=60):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = time.time() + prune_interval
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_rate_buckets_full_at ON rate_buckets (full_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (burst - tokens) / rate)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if now >= self._next_prune:
+            self._next_prune = now + self.prune_interval
+            self.prune()
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def prune(self):
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM rate_buckets WHERE full_at <= ?', (time.time(),)).rowcount
+
+
+class RateLimiter:
+    """
+    Per-client token buckets. Endpoints listed in ``limits`` get a bucket of
+    their own per client; every other endpoint draws from one shared
+    bucket per client sized by ``default``.
+    """
+
+    def __init__(self, store=None, default='300/minute', limits=None):
+        self.store = store or MemoryBucketStore()
+        self.default = parse_limit(default) if default else None
+        self.limits = limits or {}
+
+    def hit(self, identity, endpoint):
+        """Spend one request for ``identity``; returns seconds to wait, or None if allowed."""
+        limit = self.limits.get(endpoint)
+        if limit is not None:
+            key = f'{identity}|{endpoint}'
+        elif self.default is not None:
+            limit, key = self.default, f'{identity}|*'
+        else:
+            return None
+
+        allowed, retry_after = self.store.take(key, *limit)
+        return None if allowed else retry_after
+
+
+def check_rate_limit(identity):
+    """
+    Count the current request against ``identity``. Returns None when it may
+    proceed, otherwise the whole number of seconds for ``Retry-After``.
+    Does nothing when rate limiting isn't enabled on the app.
+    """
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        return None
+    retry_after = limiter.hit(identity, request.endpoint)
+    return None if retry_after is None else max(1, math.ceil(retry_after))
+
+
+def init_rate_limiting(app, limiter=None):
+    """
+    Enable the limiter consulted by ``token_required`` and ``login_required``.
+    Buckets live in memory unless ``RATE_LIMIT_STORE`` names a SQLite file,
+    which lets several worker processes on one host share them.
+    """
+    if limiter is None:
+        path = app.config.get('RATE_LIMIT_STORE')
+        limiter = RateLimiter(
+            store=SQLiteBucketStore(path) if path else MemoryBucketStore(),
+            default=app.config.get('RATE_LIMIT_DEFAULT', '300/minute'),
+            limits=parse_limits(app.config.get('RATE_LIMITS', ''))
+        )
+    app.extensions['rate_limiter'] = limiter
+    return limiter
@@ -0,0 +1,170 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_, create_engine, or_, select
+
+from models import db, Event, Resource, EventResourceAllocation, ArchivedEvent, ArchivedAllocation
+from utils.archive import latest_archived_time
+
+# Engines opened by report worker processes, one per database URL
+_worker_engines = {}
+
+# Process pool shared by all reports in this process, created on first use
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _aggregate(conn, resource_ids, range_start, range_end, upcoming_from, include_archive):
+    """
+    Partial aggregate for one partition of resources:
+    {resource_id: [hours, bookings, upcoming]}. Bookings and hours count
+    events starting in [range_start, range_end) (either bound may be None);
+    upcoming counts events starting at or after ``upcoming_from``.
+    """
+    totals = {resource_id: [0.0, 0, 0] for resource_id in resource_ids}
+
+    def in_range(start_column):
+        conditions = []
+        if range_start is not None:
+            conditions.append(start_column >= range_start)
+        if range_end is not None:
+            conditions.append(start_column < range_end)
+        return and_(*conditions) if conditions else None
+
+    def add(rows, count_upcoming):
+        for resource_id, start_time, end_time in rows:
+            entry = totals[resource_id]
+            if (range_start is None or start_time >= range_start) and (range_end is None or start_time < range_end):
+                entry[0] += (end_time - start_time).total_seconds() / 3600
+                entry[1] += 1
+            if count_upcoming and start_time >= upcoming_from:
+                entry[2] += 1
+
+    window = in_range(Event.start_time)
+    hot = (
+        select(EventResourceAllocation.resource_id, Event.start_time, Event.end_time)
+        .join(Event, Event.event_id == EventResourceAllocation.event_id)
+        .where(EventResourceAllocation.resource_id.in_(resource_ids))
+    )
+    if window is not None:
+        hot = hot.where(or_(window, Event.start_time >= upcoming_from))
+    add(conn.execute(hot), count_upcoming=True)
+
+    if include_archive:
+        archived = (
+            select(ArchivedAllocation.resource_id, ArchivedEvent.start_time, ArchivedEvent.end_time)
+            .join(ArchivedEvent, ArchivedEvent.event_id == ArchivedAllocation.event_id)
+            .where(ArchivedAllocation.resource_id.in_(resource_ids))
+        )
+        window = in_range(ArchivedEvent.start_time)
+        if window is not None:
+            archived = archived.where(window)
+        # Archived events are in the past, so they are never upcoming
+        add(conn.execute(archived), count_upcoming=False)
+
+    return totals
+
+
+def _aggregate_in_worker(database_url, *args):
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = create_engine(database_url)
+    with engine.connect() as conn:
+        return _aggregate(conn, *args)
+
+
+def _partitions(items, count):
+    """Split ``items`` round-robin into at most ``count`` non-empty partitions."""
+    return [p for p in (items[i::count] for i in range(count)) if p]
+
+
+def _get_pool(workers):
+    """
+    The shared report pool, (re)created when the worker count changes.
+    Starting spawn workers costs far more than a typical report, so they
+    are kept for the life of the process.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn, not fork: the parent holds open connections and job threads
+            context = multiprocessing.get_context('spawn')
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def utilization_report(start_date, end_date, progress=None, workers=1):
+    """
+    Hours used, bookings within [start_date, end_date] and upcoming bookings
+    per resource. Archived bookings are included when the range reaches back
+    into the archive. Either date may be None for an open-ended range.
+
+    With ``workers`` > 1, resources are split into partitions whose partial
+    aggregates are computed in a process pool and merged. ``progress`` is
+    called with a 0-1 fraction as partitions complete.
+    """
+    range_start = datetime.combine(start_date, time.min) if start_date else None
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
+    upcoming_from = datetime.combine(date.today() + timedelta(days=1), time.min)
+
+    # Only touch the archive when the requested range reaches back into it
+    latest_archived = latest_archived_time()
+    include_archive = bool(latest_archived) and (start_date is None or start_date <= latest_archived.date())
+
+    resources = (
+        db.session.query(Resource.resource_id, Resource.resource_name, Resource.resource_type)
+        .order_by(Resource.resource_id)
+        .all()
+    )
+    resource_ids = [r.resource_id for r in resources]
+    # Several partitions per worker evens out resources with very different booking counts
+    partitions = _partitions(resource_ids, max(1, workers) * 4)
+    args = (range_start, range_end, upcoming_from, include_archive)
+
+    totals = {}
+    if workers > 1 and len(partitions) > 1:
+        database_url = db.engine.url.render_as_string(hide_password=False)
+        pool = _get_pool(workers)
+        try:
+            futures = [pool.submit(_aggregate_in_worker, database_url, partition, *args) for partition in partitions]
+            for done, future in enumerate(as_completed(futures), start=1):
+                totals.update(future.result())
+                if progress:
+                    progress(done / len(futures))
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next report
+            _discard_pool(pool)
+            raise
+    else:
+        conn = db.session.connection()
+        for done, partition in enumerate(partitions, start=1):
+            totals.update(_aggregate(conn, partition, *args))
+            if progress:
+                progress(done / len(partitions))
+
+    report_data = []
+    for resource in resources:
+        hours, bookings, upcoming = totals[resource.resource_id]
+        report_data.append({
+            'name': resource.resource_name,
+            'type': resource.resource_type,
+            'hours': round(hours, 2),
+            'bookings': bookings,
+            'upcoming': upcoming
+        })
+    return report_data
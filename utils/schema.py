@@ -0,0 +1,151 @@
+from sqlalchemy import MetaData, UniqueConstraint, inspect, select, text, update
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from config import Config
+from models import db
+from utils.timezones import to_utc
+
+
+# =====================================================
+# SCHEMA UPGRADES
+# =====================================================
+# ``db.create_all()`` only creates missing tables. Databases created before
+# a column, index or constraint was added to the models are brought up to
+# date here. Every step checks the live schema first, so running the
+# upgrade again is a no-op.
+
+def _fill_value(column):
+    """Value for existing rows of a newly added column: its Python-side default, if any."""
+    default = column.default
+    if default is None or not default.is_scalar and not default.is_callable:
+        return None
+    return default.arg(None) if default.is_callable else default.arg
+
+
+def _outdated_sqlite_table(conn, table, existing_columns):
+    """
+    Whether a SQLite table differs from the model in ways ALTER TABLE can't
+    fix: NOT NULL or unique columns to add, unique constraints or
+    AUTOINCREMENT missing.
+    """
+    missing = [c for c in table.columns if c.name not in existing_columns]
+    if any(not c.nullable or c.unique for c in missing):
+        return True
+
+    inspector = inspect(conn)
+    existing_unique = {tuple(u['column_names']) for u in inspector.get_unique_constraints(table.name)}
+    existing_unique |= {tuple(i['column_names']) for i in inspector.get_indexes(table.name) if i['unique']}
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and tuple(constraint.columns.keys()) not in existing_unique:
+            return True
+
+    if table.dialect_options['sqlite'].get('autoincrement'):
+        sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if 'AUTOINCREMENT' not in sql.upper():
+            return True
+    return False
+
+
+def _rebuild_sqlite_table(conn, table, existing_columns):
+    """
+    Recreate ``table`` from the model and copy its rows over (the
+    procedure the SQLite docs give for schema changes ALTER can't make).
+    Columns the old table lacks get their default.
+    """
+    # A private copy of the metadata, so the new table can be created under a temporary name
+    scratch = MetaData()
+    for model_table in db.metadata.sorted_tables:
+        model_table.to_metadata(scratch)
+    temporary = scratch.tables[table.name].to_metadata(scratch, name=f'_upgrade_{table.name}')
+    conn.execute(CreateTable(temporary))
+
+    copied = [c.name for c in table.columns if c.name in existing_columns]
+    added = [c for c in table.columns if c.name not in existing_columns]
+    names = ', '.join(copied + [c.name for c in added])
+    values = ', '.join(copied + [f':{c.name}' for c in added])
+    conn.execute(
+        text(f'INSERT INTO {temporary.name} ({names}) SELECT {values} FROM {table.name}'),
+        {c.name: _fill_value(c) for c in added}
+    )
+    conn.exec_driver_sql(f'DROP TABLE {table.name}')
+    conn.exec_driver_sql(f'ALTER TABLE {temporary.name} RENAME TO {table.name}')
+
+
+def _add_columns(conn, table, existing_columns):
+    """Add missing columns with ALTER TABLE and backfill their defaults."""
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+        value = _fill_value(column)
+        if value is not None:
+            conn.execute(text(f'UPDATE {table.name} SET {column.name} = :value'), {'value': value})
+        if not column.nullable:
+            conn.exec_driver_sql(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} SET NOT NULL')
+
+
+def _localize_event_times(conn, table):
+    """
+    Before events had a timezone, add_event stored the form's wall-clock
+    times unconverted. Read those as local to DEFAULT_TIMEZONE, store them
+    as UTC like every newer row, and record the zone on the event.
+    """
+    tz_name = Config.DEFAULT_TIMEZONE
+    rows = conn.execute(select(table.c.event_id, table.c.start_time, table.c.end_time)).all()
+    for event_id, start_time, end_time in rows:
+        conn.execute(
+            update(table).where(table.c.event_id == event_id)
+            .values(start_time=to_utc(start_time, tz_name), end_time=to_utc(end_time, tz_name), timezone=tz_name)
+        )
+
+
+# Data fixes that must run once, when the given column is first added
+DATA_UPGRADES = {
+    ('events', 'timezone'): _localize_event_times,
+    ('archived_events', 'timezone'): _localize_event_times,
+}
+
+
+def upgrade_database(engine):
+    """
+    Create missing tables and bring existing ones in line with the models.
+    Returns {table name: [added column names]} for the tables that changed.
+    """
+    changes = {}
+    with engine.connect() as conn:
+        sqlite = conn.dialect.name == 'sqlite'
+        if sqlite:
+            # pysqlite doesn't open a transaction for DDL; make the whole upgrade atomic
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+        existing_tables = set(inspect(conn).get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c['name'] for c in inspect(conn).get_columns(table.name)}
+            added = [c.name for c in table.columns if c.name not in existing_columns]
+
+            if sqlite and _outdated_sqlite_table(conn, table, existing_columns):
+                _rebuild_sqlite_table(conn, table, existing_columns)
+                changes[table.name] = added
+            elif added:
+                _add_columns(conn, table, existing_columns)
+                changes[table.name] = added
+
+            for column in added:
+                data_upgrade = DATA_UPGRADES.get((table.name, column))
+                if data_upgrade is not None:
+                    data_upgrade(conn, table)
+
+        db.metadata.create_all(conn)
+
+        for table in db.metadata.sorted_tables:
+            existing_indexes = {i['name'] for i in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    conn.execute(CreateIndex(index))
+        conn.commit()
+    return changes
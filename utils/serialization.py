@@ -0,0 +1,75 @@
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+from utils.timezones import utc_isoformat
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+def _default(obj):
+    # ISO 8601 for dates regardless of encoder (Flask's own default is an HTTP date).
+    # Naive datetimes are stored UTC, so they are written with an explicit offset.
+    if isinstance(obj, datetime) and obj.tzinfo is None:
+        return utc_isoformat(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def dumps_bytes(obj):
+    """Serialize ``obj`` to compact JSON bytes using the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that uses orjson when it is installed, so ``jsonify``
+    and ``app.json`` get the faster encoder without any call-site changes.
+    Dates and datetimes are always written in ISO 8601, naive ones as UTC.
+    """
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+
+def parse_fields(raw, available):
+    """
+    Turn a ``fields=title,start_time`` query value into a list of field names.
+    Returns every available field when ``raw`` names none (``''``, ``','``);
+    raises ValueError on unknown names.
+    """
+    # Duplicates are dropped, first occurrence wins
+    fields = list(dict.fromkeys(name.strip() for name in (raw or '').split(',') if name.strip()))
+    if not fields:
+        return list(available)
+
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def select_fields(query, columns, fields):
+    """Restrict ``query`` to the given fields so it yields light row tuples, not ORM objects."""
+    return query.with_entities(*(columns[name] for name in fields))
+
+
+def rows_to_dicts(rows, fields):
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Event, Resource, EventResourceAllocation, Tombstone
+from utils.timezones import utc_isoformat
+
+EPOCH = datetime(1970, 1, 1)
+
+# table name -> (model, primary key, columns sent to clients)
+SYNC_TABLES = {
+    'events': (Event, Event.event_id, [
+        Event.event_id, Event.user_id, Event.title, Event.start_time,
+        Event.end_time, Event.timezone, Event.description, Event.updated_at,
+    ]),
+    'resources': (Resource, Resource.resource_id, [
+        Resource.resource_id, Resource.resource_name, Resource.resource_type, Resource.capacity,
+        Resource.buffer_before_minutes, Resource.buffer_after_minutes, Resource.updated_at,
+    ]),
+    'allocations': (EventResourceAllocation, EventResourceAllocation.allocation_id, [
+        EventResourceAllocation.allocation_id, EventResourceAllocation.event_id,
+        EventResourceAllocation.resource_id, EventResourceAllocation.updated_at,
+    ]),
+}
+TABLE_FOR_MODEL = {model: name for name, (model, _, _) in SYNC_TABLES.items()}
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def encode_token(moment):
+    return str((moment - EPOCH) // timedelta(microseconds=1))
+
+
+def decode_token(token):
+    try:
+        return EPOCH + timedelta(microseconds=int(token))
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidSyncToken('Invalid sync token!')
+
+
+def _row_to_dict(row):
+    return {
+        key: utc_isoformat(value) if isinstance(value, datetime) else value
+        for key, value in row._mapping.items()
+    }
+
+
+def changes_since(since, tombstone_days, clock_margin_seconds=5):
+    """
+    Return rows changed and ids deleted since ``since`` (a naive UTC datetime,
+    or None for a full snapshot), plus the token for the next call.
+
+    The next token is taken slightly before the read started so a write that
+    was still committing is picked up next time; clients apply changes as
+    upserts, so the small overlap is harmless.
+    """
+    started = datetime.utcnow()
+    reset = since is None or since < started - timedelta(days=tombstone_days)
+
+    changes = {'token': encode_token(started - timedelta(seconds=clock_margin_seconds)), 'reset': reset}
+    deleted = {}
+
+    for name, (model, primary_key, columns) in SYNC_TABLES.items():
+        query = db.session.query(*columns)
+        if not reset:
+            query = query.filter(model.updated_at >= since)
+        changes[name] = [_row_to_dict(row) for row in query.order_by(model.updated_at)]
+
+        if not reset:
+            deleted[name] = [
+                row_id for (row_id,) in
+                db.session.query(Tombstone.row_id)
+                .filter(Tombstone.table_name == name, Tombstone.deleted_at >= since)
+            ]
+
+    changes['deleted'] = deleted
+    return changes
+
+
+def purge_tombstones(days):
+    """Delete tombstones older than ``days``; clients that far behind get a full reset."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    purged = Tombstone.query.filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return purged
+
+
+def _record_tombstones(session, flush_context, instances):
+    for obj in list(session.deleted):
+        table_name = TABLE_FOR_MODEL.get(type(obj))
+        if table_name:
+            primary_key = SYNC_TABLES[table_name][1]
+            session.add(Tombstone(table_name=table_name, row_id=getattr(obj, primary_key.key)))
+
+
+def init_sync():
+    """Record a tombstone for every event, resource or allocation deleted through the session."""
+    if not event.contains(Session, 'before_flush', _record_tombstones):
+        event.listen(Session, 'before_flush', _record_tombstones)
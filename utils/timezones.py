@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+# Every stored timestamp is naive UTC, so range and overlap filters compare
+# values of a single convention and stay plain index comparisons. The
+# event's own IANA zone is kept alongside to recover its local wall time.
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """ZoneInfo for an IANA name such as ``Europe/Berlin``; raises ValueError if unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+@lru_cache(maxsize=1)
+def timezone_choices():
+    return sorted(available_timezones())
+
+
+def to_utc(value, tz_name='UTC'):
+    """
+    Normalize ``value`` to naive UTC. Aware datetimes are converted; naive
+    ones are wall-clock times in ``tz_name``.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=get_zone(tz_name))
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_datetime(value, tz_name='UTC'):
+    """
+    Parse an ISO 8601 string into naive UTC. A ``Z`` suffix or offset wins;
+    without one the time is read as local to ``tz_name``. Raises ValueError.
+    """
+    return to_utc(datetime.fromisoformat(value.replace('Z', '+00:00')), tz_name)
+
+
+def to_local(value, tz_name):
+    """Aware local datetime in ``tz_name`` for a stored (naive UTC) timestamp."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).astimezone(get_zone(tz_name or 'UTC'))
+
+
+def utc_isoformat(value):
+    """ISO 8601 with an explicit UTC offset for a stored (naive UTC) timestamp."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).isoformat()